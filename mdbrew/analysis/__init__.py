@@ -1,8 +1,9 @@
 from .msd import MSD
-from .rdf import RDF
+from .rdf import RDF, PartialRDF, RDFAccumulator
+from .pipeline import Pipeline, FrameMap
 from .centerofmass import make_centerofmass_data
 from .atom import atom2mass
 from . import hydrogenbonding
 
 
-__all__ = ["MSD", "RDF", "make_centerofmass_data", "atom2mass", "hydrogenbonding"]
+__all__ = ["MSD", "RDF", "PartialRDF", "RDFAccumulator", "Pipeline", "FrameMap", "make_centerofmass_data", "atom2mass", "hydrogenbonding"]
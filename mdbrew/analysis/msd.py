@@ -7,6 +7,7 @@ from mdbrew.tool.colorfont import color
 
 # Class of Mean Square Displacement
 class MSD(object):
+    fields = ("x", "y", "z")
     axis_dict = {"frame": 0, "N_particle": 1, "pos": -1}
     kwrgs_trange = {
         "desc": f"[ {color.font_cyan}BREW{color.reset} ]  #{color.font_green}MSD{color.reset} ",
@@ -48,35 +49,57 @@ class MSD(object):
         NDArray[np.float64]: result of MSD
         """
         if type(self.position) == Brewery:
+            end = self.position.n_frames if end is None else min(end, self.position.n_frames)
+            frames = range(start, end, step)
             if self._do_unwrap:
-                self.position.move_frame(start)
-                ixyz = None
-                unwrapped_position = self.position.coords[None, :]
-                pre_position = self.position.coords
-                pos_range = tqdm(self.position.frange(start=start + 1, end=end, step=step), **self.kwrgs_pos)
-                for _ in pos_range:
-                    this_position = self.position.coords
-                    up, ixyz = _spacer.unwrap_position(
-                        pre_position=pre_position,
-                        position=this_position,
-                        box=self.position.box_size,
-                        ixyz=ixyz,
-                        return_ixyz=True,
-                    )
-                    pre_position = this_position
-                    unwrapped_position = np.concatenate([unwrapped_position, up[None, :]], axis=0)
-                self.position = unwrapped_position
+                self._start(frames=frames)
+                for frame in tqdm(self.position.iter_frames(frames=frames), total=len(frames), **self.kwrgs_pos):
+                    self._unit_frame(frame=frame)
+                self.position = self._position_block
             else:
-                pos_range = tqdm(self.position.frange(start=start, end=end, step=step), **self.kwrgs_pos)
-                self.position = np.array([self.position.coords for _ in pos_range], dtype=self._dtype)
+                self.position = self.position.read_block(frames=frames, dtype=self._dtype, verbose=True)
         else:
             self.position = _spacer.check_dimension(self.position, dim=3)
+        self._cal_result()
+        return self
+
+    # Steps of the Pipeline, the positions of the frames are saved and the MSD is calculated at the end
+    def _bind(self, brewery: Brewery):
+        assert type(self.position) == Brewery, "Only the MSD of the brewery can be run in the pipeline"
+        assert brewery.is_same_trajectory(self.position), "MSD is not of this trajectory"
+        self.position = brewery.order(what=self.position.what)
+
+    def _start(self, frames):
+        self._position_block = np.empty((len(frames), *self.position.coords.shape), dtype=self._dtype)
+        self._position_ith = 0
+        self._ixyz = None
+
+    def _unit_frame(self, frame):
+        ith = self._position_ith
+        this_position = self.position.coords
+        if self._do_unwrap and ith:
+            self._position_block[ith], self._ixyz = _spacer.unwrap_position(
+                pre_position=self._pre_position,
+                position=this_position,
+                box=self.position.box_size,
+                ixyz=self._ixyz,
+                return_ixyz=True,
+            )
+        else:
+            self._position_block[ith] = this_position
+        self._pre_position = this_position.copy()
+        self._position_ith += 1
+
+    def _finish(self):
+        self.position = self._position_block
+        self._cal_result()
+
+    def _cal_result(self):
         self.frame_number = self.position.shape[0]
         if self._fft:
             self._result = self.__get_msd_fft()
         else:
             self._result = self.__get_msd_window()
-        return self
 
     @property
     def result(self):
@@ -0,0 +1,96 @@
+import numpy as np
+from mdbrew.main.brewery import Brewery
+
+
+class FrameMap(object):
+    """FrameMap
+
+    Call `func(*breweries)` on every frame of the pipeline and keep the results
+
+    Parameters
+    ------------
+    func : Callable
+        Function of the breweries at the current frame
+    breweries : Brewery
+        Selections used by `func`, they are the views of the reader of the pipeline
+
+    ## Number of the hydrogen bonds of each frame
+    >>> count = FrameMap(lambda O, H: count_HB(search_relation(O.coords, H.coords, O.box_size)).sum(), O, H)
+    """
+
+    fields = ()
+
+    def __init__(self, func, *breweries, fields=()) -> None:
+        assert all(isinstance(brewery, Brewery) for brewery in breweries), "plz input the breweries"
+        self.func = func
+        self.breweries = list(breweries)
+        self.fields = tuple(fields)
+
+    @property
+    def result(self):
+        return np.asarray(self._result)
+
+    def _bind(self, brewery: Brewery):
+        assert all(brewery.is_same_trajectory(other) for other in self.breweries), "FrameMap is not of this trajectory"
+        self.breweries = [brewery.order(what=other.what) for other in self.breweries]
+
+    def _start(self, frames):
+        self._result = []
+
+    def _unit_frame(self, frame):
+        self._result.append(self.func(*self.breweries))
+
+    def _finish(self):
+        pass
+
+
+class Pipeline(object):
+    """Pipeline
+
+    Run several analyses of one trajectory with one read of the frames. The
+    selections of the analyses become the views of the reader of `brewery`,
+    so each frame is parsed once and given to every analysis.
+
+    Each analysis has the steps `_bind(brewery)`, `_start(frames)`,
+    `_unit_frame(frame)` and `_finish()`, and `fields`, the columns it uses.
+
+    Parameters
+    ------------
+    brewery : Brewery
+        Trajectory read by the pipeline
+    analyses : RDF | MSD | FrameMap
+        Analyses of the selections of this trajectory
+
+    ## RDF, MSD and the number of the hydrogen bonds in one read
+    >>> O, H = brewery.order("atom == 'O'"), brewery.order("atom == 'H'")
+    >>> rdf, msd = RDF(O, H, r_max=6.0), MSD(position=O)
+    >>> Pipeline(brewery, rdf, msd).add(FrameMap(count_func, O, H)).run(step=10)
+    >>> rdf.result, msd.result
+    """
+
+    def __init__(self, brewery: Brewery, *analyses) -> None:
+        self.brewery = brewery
+        self.analyses = []
+        for analysis in analyses:
+            self.add(analysis)
+
+    def add(self, analysis):
+        for step in ("_bind", "_start", "_unit_frame", "_finish"):
+            assert hasattr(analysis, step), f"{type(analysis).__name__} can not be run in the pipeline (no {step})"
+        missing = set(getattr(analysis, "fields", ())) - set(self.brewery.parsed_columns)
+        assert not missing, f"{type(analysis).__name__} requires the columns {tuple(missing)}"
+        self.analyses.append(analysis)
+        return self
+
+    def run(self, start: int = 0, end: int = None, step: int = 1, verbose: bool = True):
+        end = self.brewery.n_frames if end is None else min(end, self.brewery.n_frames)
+        frames = range(start, end, step)
+        for analysis in self.analyses:
+            analysis._bind(brewery=self.brewery)
+            analysis._start(frames=frames)
+        for frame in self.brewery.iter_frames(frames=frames, verbose=verbose, total=len(frames)):
+            for analysis in self.analyses:
+                analysis._unit_frame(frame=frame)
+        for analysis in self.analyses:
+            analysis._finish()
+        return self
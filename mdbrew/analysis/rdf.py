@@ -1,13 +1,43 @@
 import numpy as np
 from typing import Type
-from tqdm import trange, tqdm
+from tqdm import tqdm
 from mdbrew.main.brewery import Brewery
+from mdbrew.main.executor import FrameExecutor
 from mdbrew.tool.colorfont import color
-from mdbrew.tool.space import calculate_diff_position, calculate_distance, check_dimension
+from mdbrew.tool.space import (
+    check_dimension,
+    search_pair_distance,
+    bin_distance,
+    iterate_pair_distance,
+    calculate_distance_histogram,
+    calculate_pair_histogram,
+)
+
+
+BACKENDS = ("auto", "dense", "kdtree")
+DENSE_PAIR_LIMIT = 1 << 20
 
 
 # Calculate and Plot the RDF
 class RDF(object):
+    """RDF
+
+    Parameters
+    ------------
+    a_coords, b_coords : Brewery | np.ndarray
+        Selections or (F, N, 3) positions
+    backend : str, optional
+        default = "auto", the way to find the distances of the pairs
+        "dense" : every pair of a and b in the tiles of bounded memory, for the small systems
+        "kdtree" : only the pairs within r_max with the periodic KD-tree, O(N) per frame
+        "auto" : "dense" if N_a * N_b <= DENSE_PAIR_LIMIT else "kdtree"
+
+    ## RDF of the large system
+    >>> rdf = RDF(O, O, r_max=6.0, backend="kdtree").run()
+    """
+
+    fields = ("x", "y", "z")
+
     def __init__(
         self,
         a_coords,
@@ -16,16 +46,65 @@ class RDF(object):
         r_max: float = None,
         resolution: int = 1000,
         dtype: type = float,
+        backend: str = "auto",
     ):
         if isinstance(a_coords, Brewery) and isinstance(b_coords, Brewery):
-            self.instance_rdf = BreweryRDF(a=a_coords, b=b_coords, box=box, r_max=r_max, resolution=resolution, dtype=dtype)
+            self.instance_rdf = BreweryRDF(a=a_coords, b=b_coords, box=box, r_max=r_max, resolution=resolution, dtype=dtype, backend=backend)
         else:
-            self.instance_rdf = NormalRDF(a=a_coords, b=b_coords, box=box, r_max=r_max, resolution=resolution, dtype=dtype)
+            self.instance_rdf = NormalRDF(a=a_coords, b=b_coords, box=box, r_max=r_max, resolution=resolution, dtype=dtype, backend=backend)
+
+    def run(self, start=0, end=None, step=1, n_jobs: int = 1):
+        """run
+
+        Parameters
+        ------------
+        n_jobs : int, optional
+            default = 1, the frames are split into the chunks of `n_jobs` processes (-1 is all cpus)
+            and the histograms of the processes are summed
+
+        ## RDF on 16 processes
+        >>> rdf = RDF(a, b).run(n_jobs=16)
+        """
+        self.instance_rdf.run(start=start, end=end, step=step, n_jobs=n_jobs)
+        return self
+
+    def update(self, frames, n_jobs: int = 1):
+        """Add the histograms of the frames to the accumulator, the frames accumulated before are kept"""
+        self.instance_rdf.update(frames=frames, n_jobs=n_jobs)
+        return self
+
+    def merge(self, other):
+        """Add the accumulator of the other RDF (or RDFAccumulator) of the other frames"""
+        self.instance_rdf.merge(other.accumulator if isinstance(other, RDF) else other)
+        return self
+
+    def save(self, path: str):
+        self.instance_rdf.save(path=path)
+        return self
 
-    def run(self, start=0, end=None, step=1):
-        self.instance_rdf.run(start=start, end=end, step=step)
+    def load(self, path: str):
+        """Continue from the accumulator saved by `save`"""
+        self.instance_rdf.load(path=path)
         return self
 
+    @property
+    def accumulator(self):
+        return self.instance_rdf.accumulator
+
+    # Steps of the Pipeline, only the RDF of the breweries can be run in the pipeline
+    def _bind(self, brewery: Brewery):
+        assert isinstance(self.instance_rdf, BreweryRDF), "Only the RDF of the breweries can be run in the pipeline"
+        self.instance_rdf._bind(brewery=brewery)
+
+    def _start(self, frames):
+        self.instance_rdf._reset()
+
+    def _unit_frame(self, frame):
+        self.instance_rdf._unit_frame(frame=frame)
+
+    def _finish(self):
+        pass
+
     @property
     def result(self):
         if self.instance_rdf.hist_data is None:
@@ -45,13 +124,121 @@ class RDF(object):
         return self.instance_rdf.radii
 
 
+class RDFAccumulator(object):
+    """RDFAccumulator
+
+    Sums of the RDF histograms of the frames. The accumulators of the frame
+    chunks, the processes or the batch jobs are merged without computing the
+    frames again, and they are saved to .npz to continue the run later.
+
+    Parameters
+    ------------
+    r_max : float
+        Maximum distance of the histogram
+    resolution : int
+        Number of the bins
+    a_number, b_number : int | np.ndarray
+        Number of the atoms of a and b, the arrays are broadcast to `shape`
+    shape : tuple, optional
+        default = (), shape of the histograms except the axis of the bins
+    kinds : np.ndarray, optional
+        default = None, kinds of the axes of PartialRDF
+
+    ## RDF of two batch jobs
+    >>> RDF(a, b).run(start=0, end=5000).save("rdf_0.npz")
+    >>> RDF(a, b).run(start=5000).save("rdf_1.npz")
+    >>> accumulator = RDFAccumulator.load("rdf_0.npz").merge(RDFAccumulator.load("rdf_1.npz"))
+    >>> accumulator.rdf, accumulator.cn
+    """
+
+    keys = ("r_max", "resolution", "a_number", "b_number", "frame_num", "counts", "volume_counts", "volume_sum")
+
+    def __init__(self, r_max: float, resolution: int, a_number, b_number, shape: tuple = (), kinds=None) -> None:
+        self.r_max = float(r_max)
+        self.resolution = int(resolution)
+        self.a_number = np.asarray(a_number)
+        self.b_number = np.asarray(b_number)
+        self.kinds = None if kinds is None else np.asarray(kinds, dtype=str)
+        self.frame_num = 0
+        # Sum of the histograms, and of the histograms times the volume of the frame
+        self.counts = np.zeros((*shape, self.resolution))
+        self.volume_counts = np.zeros((*shape, self.resolution))
+        self.volume_sum = 0.0
+
+    @property
+    def radii(self):
+        return np.linspace(0, self.r_max, self.resolution + 1)
+
+    @property
+    def rdf(self):
+        dr = self.r_max / self.resolution
+        gr = np.zeros_like(self.volume_counts)
+        gr[..., 1:] = self.volume_counts[..., 1:] / np.square(self.radii[1:-1])
+        factor = 4.0 * np.pi * dr * self.frame_num * self.a_number * self.b_number
+        return gr / np.asarray(factor)[..., None]
+
+    @property
+    def cn(self):
+        n = self.counts / (self.frame_num * self.a_number[..., None])
+        return np.cumsum(n, axis=-1)
+
+    def add(self, hist, volume: float):
+        self.frame_num += 1
+        self.counts += hist
+        self.volume_counts += hist * volume
+        self.volume_sum += volume
+
+    def is_compatible(self, other) -> bool:
+        return (
+            self.r_max == other.r_max
+            and self.resolution == other.resolution
+            and np.array_equal(self.a_number, other.a_number)
+            and np.array_equal(self.b_number, other.b_number)
+            and self.counts.shape == other.counts.shape
+            and (self.kinds is None) == (other.kinds is None)
+            and (self.kinds is None or np.array_equal(self.kinds, other.kinds))
+        )
+
+    def merge(self, other):
+        assert self.is_compatible(other), "The accumulators of the different RDF can not be merged"
+        self.frame_num += other.frame_num
+        self.counts += other.counts
+        self.volume_counts += other.volume_counts
+        self.volume_sum += other.volume_sum
+        return self
+
+    def save(self, path: str):
+        data = {key: getattr(self, key) for key in self.keys}
+        if self.kinds is not None:
+            data["kinds"] = self.kinds
+        np.savez(path, **data)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path, allow_pickle=False) as npz:
+            data = {key: npz[key] for key in npz.files}
+        accumulator = cls(
+            r_max=data["r_max"],
+            resolution=data["resolution"],
+            a_number=data["a_number"],
+            b_number=data["b_number"],
+            shape=data["counts"].shape[:-1],
+            kinds=data.get("kinds", None),
+        )
+        accumulator.frame_num = int(data["frame_num"])
+        accumulator.counts = data["counts"]
+        accumulator.volume_counts = data["volume_counts"]
+        accumulator.volume_sum = float(data["volume_sum"])
+        return accumulator
+
+
 class InterfaceRDF(object):
     kwrgs_trange = {
         "desc": f"[ {color.font_cyan}BREW{color.reset} ]  #{color.font_green}RDF{color.reset} ",
         "ncols": 60,
         "ascii": True,
     }
-    hist_data = None
+    accumulator = None
     radii = None
 
     def __init__(
@@ -62,38 +249,91 @@ class InterfaceRDF(object):
         r_max: float = None,
         resolution: int = 1000,
         dtype: str = float,
+        backend: str = "auto",
     ):
         self.r_max = np.max(self.box) * 0.5 if r_max is None else r_max
         self.resolution = resolution
         self._dtype = dtype
+        assert backend in BACKENDS, f"backend should be in {BACKENDS}"
+        if backend == "auto":
+            backend = "dense" if self.a_number * self.b_number <= DENSE_PAIR_LIMIT else "kdtree"
+        self.backend = backend
 
-    def run(self, start=0, end=None, step=1):
+    @property
+    def n_frames(self):
         pass
 
-    def _unit_run(self, a_unit, b_unit, box_unit):
-        diff_position = calculate_diff_position(a_unit[:, None, :], b_unit[None, :, :])
-        diff_position = self._check_pbc(diff_position=diff_position, box=box_unit)
-        distance = calculate_distance(diff_position=diff_position, axis=-1)
-        each_hist, dr_arr = np.histogram(distance, bins=self.resolution, range=(0, self.r_max))
-        self.frame_num += 1
-        self.hist_data += each_hist
-        self.gr[1:] += each_hist[1:] / np.square(dr_arr[1:-1]) * np.prod(box_unit)
+    @property
+    def hist_data(self):
+        return None if self.accumulator is None else self.accumulator.counts
+
+    @property
+    def frame_num(self):
+        return self.accumulator.frame_num
+
+    def run(self, start=0, end=None, step=1, n_jobs: int = 1):
+        end = self.n_frames if end is None else min(end, self.n_frames)
+        self._reset()
+        self.update(frames=range(start, end, step), n_jobs=n_jobs)
+
+    def update(self, frames, n_jobs: int = 1):
+        if self.accumulator is None:
+            self._reset()
+        if n_jobs == 1:
+            self._run_frames(frames=frames, verbose=True)
+            return
+        executor = FrameExecutor(n_jobs=n_jobs)
+        for accumulator in executor.map(self._run_partial, frames=frames, verbose=True, **self.kwrgs_trange):
+            self.accumulator.merge(accumulator)
+
+    def merge(self, accumulator: RDFAccumulator):
+        if self.accumulator is None:
+            self._reset()
+        self.accumulator.merge(accumulator)
+
+    def save(self, path: str):
+        assert self.accumulator is not None, "There is no frame to save, plz run first"
+        self.accumulator.save(path=path)
+
+    def load(self, path: str):
+        accumulator = RDFAccumulator.load(path=path)
+        assert self._make_accumulator().is_compatible(accumulator), f"{path} is not the accumulator of this RDF"
+        self.accumulator = accumulator
+
+    # Add the histograms of the frames to the accumulator
+    def _run_frames(self, frames, verbose: bool = True):
+        pass
 
-    # set the pbc only consider single system
-    def _check_pbc(self, diff_position, box):
-        diff_position = np.abs(diff_position)
-        return np.where(diff_position > 0.5 * box, box - diff_position, diff_position)
+    # Accumulator of the frames only, it is the partial result of the process in the parallel run
+    def _run_partial(self, frames):
+        self._reset()
+        self._run_frames(frames=frames, verbose=False)
+        return self.accumulator
+
+    def _make_accumulator(self):
+        return RDFAccumulator(r_max=self.r_max, resolution=self.resolution, a_number=self.a_number, b_number=self.b_number)
+
+    def _reset(self):
+        self.accumulator = self._make_accumulator()
+
+    def _unit_run(self, a_unit, b_unit, box_unit):
+        # Only the pairs i < j are computed for the same selection
+        if self.is_same_selection:
+            b_unit = a_unit
+        if self.backend == "kdtree":
+            *_, distance = search_pair_distance(a_position=a_unit, b_position=b_unit, box=box_unit, r_max=self.r_max)
+            each_hist = calculate_distance_histogram(distance=distance, r_max=self.r_max, resolution=self.resolution)
+        else:
+            each_hist = calculate_pair_histogram(a_unit, b_unit, box=box_unit, r_max=self.r_max, resolution=self.resolution)
+        self.accumulator.add(hist=each_hist, volume=np.prod(box_unit))
 
     # Calculate the Density Function
     def _cal_rdf(self):
-        dr = self.r_max / self.resolution
-        factor = 4.0 * np.pi * dr * self.frame_num * self.a_number * self.b_number
-        return self.gr / factor
+        return self.accumulator.rdf
 
     # Function for get coordinate number
     def _cal_cn(self):
-        self.n = self.hist_data / (self.frame_num * self.a_number)
-        return np.cumsum(self.n)
+        return self.accumulator.cn
 
 
 class BreweryRDF(InterfaceRDF):
@@ -105,39 +345,52 @@ class BreweryRDF(InterfaceRDF):
         r_max: float = None,
         resolution: int = 1000,
         dtype: type = float,
+        backend: str = "auto",
     ):
         self.a = a.reorder()
-        self.b = b.reorder()
+        # The selections of one trajectory are the views of one reader, so each frame is read once
+        self.b = self.a.order(what=b.what) if a.is_same_trajectory(b) else b.reorder()
         self.a_number = a.atom_num
         self.b_number = b.atom_num
+        self.is_same_selection = self.a.opener is self.b.opener and self.a.what == self.b.what
         self.is_box_input = box is not None
         self.box = a.box_size if box is None else box
         assert len(self.box), "plz set box"
-        super().__init__(self.a, self.b, self.box, r_max, resolution, dtype)
+        super().__init__(self.a, self.b, self.box, r_max, resolution, dtype, backend)
 
-    def run(self, start=0, end=None, step=1):
-        self.frame_num = 0
-        self.gr = np.zeros(self.resolution)
-        self.hist_data = np.zeros(self.resolution)
-        frange = self._make_frange(start=start, end=end, step=step)
-        for idx in tqdm(frange, **self.kwrgs_trange):
-            a_unit = self.a.coords
-            b_unit = self.b.coords
-            box_unit = self._make_box(self.box, idx)
-            self._unit_run(a_unit=a_unit, b_unit=b_unit, box_unit=box_unit)
+    @property
+    def n_frames(self):
+        return self.a.n_frames
+
+    def _run_frames(self, frames, verbose: bool = True):
+        for idx in tqdm(self._make_frange(frames=frames), total=len(frames), disable=not verbose, **self.kwrgs_trange):
+            self._unit_frame(frame=idx)
+
+    def _unit_frame(self, frame):
+        a_unit = self.a.coords
+        b_unit = self.b.coords
+        box_unit = self._make_box(self.box, frame)
+        self._unit_run(a_unit=a_unit, b_unit=b_unit, box_unit=box_unit)
 
-    def _make_frange(self, start=0, end=None, step=1):
-        kwrgs = {"start": start, "end": end, "step": step}
-        if self.a is self.b:
-            return self.a.frange(**kwrgs)
-        return zip(self.a.frange(**kwrgs), self.b.frange(**kwrgs))
+    # Make the selections the views of the reader of `brewery`
+    def _bind(self, brewery: Brewery):
+        assert brewery.is_same_trajectory(self.a) and brewery.is_same_trajectory(self.b), "RDF is not of this trajectory"
+        self.a = brewery.order(what=self.a.what)
+        self.b = brewery.order(what=self.b.what)
+
+    def _make_frange(self, frames):
+        if self.a.opener is self.b.opener:
+            return self.a.iter_frames(frames=frames)
+        return zip(self.a.iter_frames(frames=frames), self.b.iter_frames(frames=frames))
 
     def _make_box(self, box, idx):
         if not self.is_box_input:
             return np.array(self.a.box_size)
         box = np.array(box)
-        assert idx[0] == idx[1], "Reset Error"  # idx = (0, 0), (1, 1), ...
-        return box if box.ndim == 1 else box[idx[0]]
+        if isinstance(idx, tuple):
+            assert idx[0] == idx[1], "Reset Error"  # idx = (0, 0), (1, 1), ...
+            idx = idx[0]
+        return box if box.ndim == 1 else box[idx]
 
 
 class NormalRDF(InterfaceRDF):
@@ -149,20 +402,22 @@ class NormalRDF(InterfaceRDF):
         r_max: float = None,
         resolution: int = 1000,
         dtype: type = float,
+        backend: str = "auto",
     ):
         self.a = check_dimension(a, dim=3, dtype=dtype)
         self.b = check_dimension(b, dim=3, dtype=dtype)
         self.a_number = self.a.shape[1]
         self.b_number = self.b.shape[1]
+        self.is_same_selection = a is b
         self.box = self._make_box(box=box)
-        super().__init__(a, b, box, r_max, resolution, dtype)
+        super().__init__(a, b, box, r_max, resolution, dtype, backend)
 
-    def run(self, start=0, end=None, step=1):
-        self.frame_num = 0
-        self.gr = np.zeros(self.resolution)
-        self.hist_data = np.zeros(self.resolution)
-        # self.frame_num = self.a.shape[0] if end is None else end - start + 1
-        for frame in trange(start=start, stop=end, step=step, **self.kwrgs_trange):
+    @property
+    def n_frames(self):
+        return len(self.a)
+
+    def _run_frames(self, frames, verbose: bool = True):
+        for frame in tqdm(frames, disable=not verbose, **self.kwrgs_trange):
             a_unit = self.a[frame, ...]
             b_unit = self.b[frame, ...]
             box_unit = self.box[frame]
@@ -176,3 +431,143 @@ class NormalRDF(InterfaceRDF):
                 raise ValueError(f"Check your box shape, total frame: {frame_num} != box frame: {box_frame}")
             return np.tile(box, (frame_num, 1))
         return box
+
+
+class PartialRDF(BreweryRDF):
+    """PartialRDF
+
+    RDF of every pair of the kinds (O-O, O-H, H-H, ...) of one selection. The
+    distances of the atoms are computed once per frame and are sorted into
+    the histograms of the pairs of the kinds by one bincount.
+
+    Parameters
+    ------------
+    brewery : Brewery
+        Selection of the atoms, the kinds are the atom_kind of it
+    backend : str, optional
+        default = "auto", same as the backend of RDF
+
+    ## g_OH(r) and the coordination number of H around O
+    >>> prdf = PartialRDF(brewery, r_max=6.0).run()
+    >>> prdf.kinds
+    array(['H', 'O'], dtype='<U1')
+    >>> prdf.get("O", "H"), prdf.get_cn("O", "H")
+    >>> prdf.result.shape  # (kinds, kinds, resolution)
+    """
+
+    fields = ("x", "y", "z")
+
+    def __init__(
+        self,
+        brewery: Type[Brewery],
+        box=None,
+        r_max: float = None,
+        resolution: int = 1000,
+        dtype: type = float,
+        backend: str = "auto",
+    ):
+        topology = brewery.topology
+        self.kinds = topology.kinds
+        self.counts = topology.counts
+        super().__init__(brewery, brewery, box, r_max, resolution, dtype, backend)
+
+    def run(self, start=0, end=None, step=1, n_jobs: int = 1):
+        super().run(start=start, end=end, step=step, n_jobs=n_jobs)
+        return self
+
+    def update(self, frames, n_jobs: int = 1):
+        super().update(frames=frames, n_jobs=n_jobs)
+        return self
+
+    def merge(self, other):
+        super().merge(other.accumulator if isinstance(other, PartialRDF) else other)
+        return self
+
+    def save(self, path: str):
+        super().save(path=path)
+        return self
+
+    def load(self, path: str):
+        super().load(path=path)
+        return self
+
+    @property
+    def result(self):
+        if self.hist_data is None:
+            self.run()
+        return self._cal_rdf()
+
+    @property
+    def cn(self):
+        if self.hist_data is None:
+            self.run()
+        return self._cal_cn()
+
+    @property
+    def radii(self):
+        return np.linspace(0, self.r_max, self.resolution + 1)
+
+    def get(self, a_kind: str, b_kind: str):
+        """g(r) of b_kind around a_kind"""
+        return self.result[self._get_kind_idx(a_kind), self._get_kind_idx(b_kind)]
+
+    def get_cn(self, a_kind: str, b_kind: str):
+        """Coordination number of b_kind around a_kind"""
+        return self.cn[self._get_kind_idx(a_kind), self._get_kind_idx(b_kind)]
+
+    # Steps of the Pipeline
+    def _start(self, frames):
+        self._reset()
+
+    def _finish(self):
+        pass
+
+    def _make_accumulator(self):
+        return RDFAccumulator(
+            r_max=self.r_max,
+            resolution=self.resolution,
+            a_number=self.counts[:, None],
+            b_number=self.counts[None, :],
+            shape=(len(self.kinds), len(self.kinds)),
+            kinds=self.kinds,
+        )
+
+    def _unit_frame(self, frame):
+        position = self.a.coords
+        box_unit = self._make_box(self.box, frame)
+        codes = self._make_codes()
+        n_kind, resolution = len(self.kinds), self.resolution
+        size = n_kind * n_kind * resolution
+        if self.backend == "kdtree":
+            a_idx, b_idx, distance = search_pair_distance(a_position=position, b_position=position, box=box_unit, r_max=self.r_max)
+            bins = bin_distance(distance=distance, r_max=self.r_max, resolution=resolution)
+            is_in = bins >= 0
+            index = (codes[a_idx[is_in]] * n_kind + codes[b_idx[is_in]]) * resolution + bins[is_in]
+            each_hist = np.bincount(index, minlength=size)
+        else:
+            each_hist = np.zeros(size, dtype=np.int64)
+            # only i < j are computed, so each pair is counted as (a, b) and (b, a)
+            for a_start, b_start, distance in iterate_pair_distance(position, position, box_unit):
+                bins = bin_distance(distance=distance, r_max=self.r_max, resolution=resolution)
+                is_in = bins >= 0
+                a_code = codes[a_start : a_start + distance.shape[0], None]
+                b_code = codes[None, b_start : b_start + distance.shape[1]]
+                pair_ab = (a_code * n_kind + b_code).ravel()[is_in]
+                pair_ba = (b_code * n_kind + a_code).ravel()[is_in]
+                index = np.concatenate((pair_ab, pair_ba)) * resolution + np.tile(bins[is_in], 2)
+                each_hist += np.bincount(index, minlength=size)
+            # pairs of the same atom
+            each_hist[(np.arange(n_kind) * (n_kind + 1)) * resolution] += np.bincount(codes, minlength=n_kind)
+        self.accumulator.add(hist=each_hist.reshape(n_kind, n_kind, resolution), volume=np.prod(box_unit))
+
+    # Codes of the atoms in the kinds of the first frame
+    def _make_codes(self):
+        topology = self.a.topology
+        kind_idx = np.searchsorted(self.kinds, topology.kinds)
+        assert np.all(self.kinds[np.minimum(kind_idx, len(self.kinds) - 1)] == topology.kinds), "New kind of atom is found"
+        return kind_idx[topology.codes]
+
+    def _get_kind_idx(self, kind: str):
+        idx = np.flatnonzero(self.kinds == str(kind))
+        assert len(idx), f"{kind} is not in kinds {tuple(self.kinds)}"
+        return idx[0]
@@ -116,12 +116,7 @@ class BrewCP2k(object):
 
     def _brew_xyzfile(self, xyz_file):
         brewery = Brewery(trj_file=xyz_file)
-        line_range = tqdm(
-            brewery.frange(),
-            desc=f"[ {color.font_cyan}BREW{color.reset} ]  #{color.font_green}XYZ{color.reset} ",
-            **self.tqmd_option,
-        )
-        self._coord_list = np.array([brewery.coords for _ in line_range])
+        self._coord_list = brewery.read_block(verbose=True)
         self.is_contain_coord = True
 
     def _brew_logfile(self, log_file):
@@ -214,7 +209,7 @@ class BrewCP2k(object):
         self._force_list = np.array(self._force_list).astype(data_type).reshape(F, N, 3)
         self._cell_list = np.tile(self._cell_list, (self._num_frame, 1)).astype(data_type).reshape(F, 3, 3)
         self._energy_list = np.array(self._energy_list).astype(data_type)
-        self._coord_list = np.array(self._coord_list).astype(data_type)
+        self._coord_list = np.asarray(self._coord_list, dtype=data_type)
         self._type_list = np.array(self._type_list).astype("int64")
 
     @color_print(name=printing_option["2a.u"])
@@ -1,6 +1,9 @@
 from . import fmt
 from .brewery import Brewery
+from .frame import Frame
+from .framecache import FrameCache
+from .topology import Topology
 from .interface import get_opener, get_writer
 
 
-__all__ = ["fmt", "Brewery", "get_opener", "get_writer"]
+__all__ = ["fmt", "Brewery", "Frame", "FrameCache", "Topology", "get_opener", "get_writer"]
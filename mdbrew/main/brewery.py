@@ -1,36 +1,48 @@
+import copy
 import numpy as np
-import pandas as pd
-from mdbrew.main.interface import get_opener, get_writer
+from mdbrew.main.frame import Frame, DEFAULT_DATA_TYPES
+from mdbrew.main.framecache import FrameCache
+from mdbrew.main.prefetch import Prefetcher
+from mdbrew.main.selection import Selection
+from mdbrew.main.topology import Topology
+from mdbrew.main.interface import get_opener, get_writer, MultiOpener
+from mdbrew.main.interface.compression import strip_compression_suffix
 from mdbrew.tool.colorfont import color
 from mdbrew.tool.decorator import color_tqdm
-from mdbrew.tool.path import check_path
-
-
-DEFAULT_DATA_TYPES = {
-    "x": float,
-    "y": float,
-    "z": float,
-    "fx": float,
-    "fy": float,
-    "fz": float,
-    "vx": float,
-    "vy": float,
-    "vz": float,
-    "id": int,
-    "idx": int,
-    "atom": str,
-    "element": str,
-    "resid": str,
-    "type": str,
-}
+from mdbrew.tool.path import check_path, check_paths, is_multi_path
 
 
 class Brewery:
+    """Brewery
+
+    Parameters
+    ------------
+    trj_file : str | List[str]
+        Path of the trajectory, the list or the glob pattern ('run.*.lammpstrj')
+        of the segments is read as one trajectory
+    drop_duplicates : bool
+        Drop the frames written again at the start of the next segment (same step)
+    prefetch : int
+        Default depth of the prefetch queue of frange and iter_frames, 0 is off
+    fields : List[str]
+        Columns to be parsed (['x', 'y', 'z']), the column of the atom keyword is always parsed
+    cache_bytes : int
+        Budget in bytes of the LRU cache of the parsed frames used by move_frame, 0 is off
+    """
+
     def __init__(self, trj_file: str, fmt: str = "auto", auto_load: bool = True, *args, **kwrgs):
         self._what = kwrgs.pop("what", None)
-        self._path = check_path(path=trj_file, **kwrgs)
+        self._prefetch = kwrgs.get("prefetch", 0)
+        cache_bytes = kwrgs.get("cache_bytes", 0)
+        self.cache = FrameCache(max_bytes=cache_bytes) if cache_bytes else None
+        if is_multi_path(trj_file):
+            self._path = check_paths(paths=trj_file, **kwrgs)
+        else:
+            self._path = check_path(path=trj_file, **kwrgs)
         self.opener = self._match_fmt_with_opener(fmt=fmt, **kwrgs)
         self._kwrgs = kwrgs
+        # Parsed frame of the opener, shared with the views of order() and reorder()
+        self._source = {}
         if auto_load:
             self.update_data()
 
@@ -49,27 +61,47 @@ class Brewery:
         print(sep_line)
         return f"\t    @CopyRight by  {color.font_blue}minu928@snu.ac.kr{color.reset}\n"
 
+    def __len__(self) -> int:
+        return self.n_frames
+
+    # The brewery in the other process starts without the cached frames
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["cache"] = None
+        return state
+
+    def __getitem__(self, key):
+        """brewery[10] -> (N, 3), brewery[0:100:10] or brewery[[0, 500, 9000]] -> (F, N, 3) coordinates"""
+        if isinstance(key, slice):
+            return self.read_block(frames=range(*key.indices(self.n_frames)))
+        if np.ndim(key):
+            return self.read_block(frames=key)
+        return self.read_block(frames=[int(key) % self.n_frames])[0]
+
+    @property
+    def topology(self) -> Topology:
+        """Kinds, counts and indices of the atoms, it is built again only when the atoms are changed"""
+        frame_data = self.frame_data
+        if getattr(self, "_topology_source", None) is not frame_data.topology:
+            self._topology = Topology(atoms=frame_data.get(cols=self.opener.atom_keyword, dtype=str))
+            self._topology_source = frame_data.topology
+        return self._topology
+
     @property
     def atom_info(self):
-        if not hasattr(self, "_atom_info"):
-            self.update_atom_info()
-        return self._atom_info
+        return self.topology.info
 
     @property
     def atom_kind(self):
-        if not hasattr(self, "_atom_kind"):
-            self.update_atom_info()
-        return self._atom_kind
+        return self.topology.kinds
 
     @property
     def atom_num(self):
-        if not hasattr(self, "_atom_num"):
-            self.update_atom_info()
-        return self._atom_num
+        return self.topology.atom_num
 
     @property
     def atoms(self):
-        return self.brew(cols=self.opener.atom_keyword, dtype=str)
+        return self.topology.atoms
 
     @property
     def box_size(self):
@@ -87,32 +119,58 @@ class Brewery:
     def columns(self, columns):
         self.opener.column = columns
 
+    @property
+    def parsed_columns(self):
+        """Columns of the parsed frames, the columns not in `fields` are not included"""
+        required_fields = self.opener.required_fields
+        return [col for col in self.columns if required_fields is None or col in required_fields]
+
     @property
     def coords(self):
-        return self.brew(cols=["x", "y", "z"], dtype=float)
+        return self.brew(cols=["x", "y", "z"])
 
     @property
     def velocities(self):
-        return self.brew(cols=["vx", "vy", "vz"], dtype=float)
+        return self.brew(cols=["vx", "vy", "vz"])
 
     @property
     def forces(self):
-        return self.brew(cols=["fx", "fy", "fz"], dtype=float)
+        return self.brew(cols=["fx", "fy", "fz"])
 
     @property
     def data(self):
+        frame_data = self.frame_data
         if not hasattr(self, "_data"):
-            self.update_data()
+            self._data = frame_data.to_dataframe()
         return self._data
 
     @data.setter
     def data(self, data):
+        # The data is kept until the next frame, the views do not see this data
+        self._source = {}
+        self._frame_source = self.opener.data
         self._data = data
+        self._frame_data = Frame.from_dataframe(dataframe=data, data_types=self.data_types)
+
+    @property
+    def frame_data(self):
+        # The reader can be moved by the other view
+        if not hasattr(self, "_frame_data") or self._frame_source is not self.opener.data:
+            self.update_data()
+        return self._frame_data
+
+    @property
+    def what(self):
+        return self._what
 
     @property
     def frame(self):
         return self.opener.frame
 
+    @property
+    def n_frames(self):
+        return self.opener.n_frames
+
     @property
     def fmt(self):
         return self.opener.fmt
@@ -124,40 +182,130 @@ class Brewery:
         return self._data_types
 
     def update_data(self):
-        self._data = pd.DataFrame(data=self.opener.data, columns=self.columns).astype(self.data_types)
+        self._frame_source = self.opener.data
+        if self._source.get("data") is not self._frame_source:
+            self._source["data"] = self._frame_source
+            self._source["frame"] = self._make_frame_data(data=self._frame_source)
+            if self.cache is not None:
+                frame = self._source["frame"]
+                self.cache.put(frame=self.frame, item=(self.opener.get_state(), frame), nbytes=frame.nbytes)
+        frame_data = self._source["frame"]
         if self._what is not None:
-            self._data.query(self._what, inplace=True)
-        assert len(self._data), "Data is empty"
+            frame_data = self.get_selection(what=self._what).take(frame=frame_data)
+        assert len(frame_data), "Data is empty"
+        self._frame_data = frame_data
+        if hasattr(self, "_data"):
+            del self._data
+
+    def _make_frame_data(self, data):
+        if isinstance(data, Frame):
+            return data
+        frame_data = Frame.from_rows(
+            rows=data,
+            columns=self.columns,
+            data_types=self.data_types,
+            topology=self._source.get("topology", None),
+        )
+        self._source["topology"] = frame_data.topology
+        return frame_data
 
     def update_atom_info(self):
-        atom_brew_data = self.brew(cols=self.opener.atom_keyword, dtype=str)
-        self._atom_info = np.unique(atom_brew_data, return_counts=True)
-        self._atom_kind = self.atom_info[0]
-        self._atom_num = np.sum(self.atom_info[1])
+        if hasattr(self, "_topology_source"):
+            del self._topology_source
+        return self.topology
 
     def next_frame(self):
+        # The reader of the opener is not at the frame restored from the cache
+        if self._source.pop("is_cached", False):
+            return self.move_frame(num=self.frame + 1)
         self.opener.next_frame()
         self.update_data()
 
     def move_frame(self, num: int):
-        self.opener.move_frame(num=int(num))
+        num = int(num)
+        item = None if self.cache is None else self.cache.get(frame=num)
+        if item is None:
+            self.opener.move_frame(num=num)
+            self._source.pop("is_cached", None)
+        else:
+            state, frame = item
+            self.opener.set_state(state)
+            self._source.update(data=self.opener.data, frame=frame, is_cached=True)
         self.update_data()
 
     def brew(self, cols=None, what: str = None, dtype: str = None):
-        data = self.data
-        data = data.query(what) if what is not None else data
-        data = data.loc[:, cols] if cols is not None else data
-        return data.to_numpy(dtype=dtype)
+        frame_data = self.frame_data
+        if what is not None:
+            frame_data = self.get_selection(what=what).take(frame=frame_data)
+        return frame_data.get(cols=cols, dtype=dtype)
+
+    # The selections are compiled once and cached with the expression
+    def get_selection(self, what: str) -> Selection:
+        if not hasattr(self, "_selections"):
+            self._selections = {}
+        if what not in self._selections:
+            self._selections[what] = Selection(what=what)
+        return self._selections[what]
 
     def order(self, what: str = None):
-        return Brewery(trj_file=self._path, fmt=self.fmt, what=what, **self._kwrgs)
+        """View of the atoms in `what`, the view shares the reader and the frame with this brewery"""
+        return self._make_view(what=what)
 
     def reorder(self):
-        return Brewery(trj_file=self._path, fmt=self.fmt, what=self._what, **self._kwrgs)
+        return self._make_view(what=self._what)
+
+    def cursor(self):
+        """cursor
+
+        Independent reader of the same trajectory, the frame index and the
+        topology are shared and the cursor has its own position and file handle.
+        Each thread should read with its own cursor.
+
+        ## Disjoint frames on the threads
+        >>> def work(frames):
+        ...     cursor = brewery.cursor()
+        ...     return [cursor.coords.mean(axis=0) for _ in cursor.iter_frames(frames=frames)]
+        >>> with ThreadPoolExecutor(4) as executor:
+        ...     results = list(executor.map(work, np.array_split(range(len(brewery)), 4)))
+        """
+        cursor = copy.copy(self)
+        cursor.opener = self.opener.clone()
+        cursor.cache = None
+        cursor._source = {key: value for key, value in self._source.items() if key == "topology"}
+        for attr in ("_frame_data", "_frame_source", "_data", "_topology", "_topology_source", "_selections"):
+            cursor.__dict__.pop(attr, None)
+        return cursor
+
+    def is_same_trajectory(self, other) -> bool:
+        if self.opener is other.opener:
+            return True
+        return self._path == other._path and self.fmt == other.fmt and _is_same_kwrgs(self._kwrgs, other._kwrgs)
+
+    def _make_view(self, what: str = None):
+        view = copy.copy(self)
+        view._what = what
+        for attr in ("_frame_data", "_frame_source", "_data", "_topology", "_topology_source"):
+            view.__dict__.pop(attr, None)
+        return view
 
     @color_tqdm(name="FRAME")
-    def frange(self, start: int = 0, end: int = None, step: int = 1, *, verbose: bool = False, total: int = None):
+    def frange(
+        self,
+        start: int = 0,
+        end: int = None,
+        step: int = 1,
+        *,
+        prefetch: int = None,
+        verbose: bool = False,
+        total: int = None,
+    ):
         assert end is None or start < end, "start should be lower than end"
+        prefetch = self._prefetch if prefetch is None else prefetch
+        if step != 1 or prefetch:
+            # The skipped frames are not parsed
+            end = self.n_frames if end is None else min(end, self.n_frames)
+            yield from self.iter_frames(frames=range(int(start), int(end), int(step)), prefetch=prefetch)
+            return
         self.move_frame(num=int(start))
         try:
             while self.frame != end:
@@ -169,6 +317,70 @@ class Brewery:
         finally:
             self.reset()  # Reset the database
 
+    def read_block(self, frames=None, fields=("x", "y", "z"), dtype=float, memmap: str = None, *, verbose: bool = False):
+        """read_block
+
+        Read the fields of the frames into one preallocated (F, N, k) array
+
+        Parameters
+        ------------
+        frames : Iterable[int], optional
+            default = None, all frames
+        fields : List[str], optional
+            default = ("x", "y", "z")
+        dtype : optional
+            default = float, np.float32 halves the memory
+        memmap : str, optional
+            default = None, if it is given the array is the np.memmap of the .npy file at this path
+
+        The selection (`what`) should select the same number of atoms in every frame.
+
+        ## Coordinates of every 10th frame
+        >>> coords = brewery.read_block(frames=range(0, len(brewery), 10))
+        """
+        frames = range(self.n_frames) if frames is None else np.asarray(frames, dtype=np.int64).ravel()
+        assert np.all((0 <= np.asarray(frames)) & (np.asarray(frames) < self.n_frames)), f"frames should be in [0, {self.n_frames})"
+        # The frames are read with the cursor, so the frame of this brewery and its views is not moved
+        cursor, block = self.cursor(), None
+        for ith, _ in enumerate(cursor.iter_frames(frames=frames, verbose=verbose, total=len(frames))):
+            values = cursor.brew(cols=list(fields))
+            if block is None:
+                block = _make_block(shape=(len(frames), *values.shape), dtype=dtype, memmap=memmap)
+            assert values.shape == block.shape[1:], "The atom number of the selection is changed, plz read_block with the static selection"
+            block[ith] = values
+        if block is None:
+            block = _make_block(shape=(0, len(self.frame_data), len(fields)), dtype=dtype, memmap=memmap)
+        if memmap is not None:
+            block.flush()
+        return block
+
+    @color_tqdm(name="FRAME")
+    def iter_frames(self, frames, *, prefetch: int = None, verbose: bool = False, total: int = None):
+        """Yield the given frames ([0, 500, 9000]), only these frames are parsed
+
+        With `prefetch` > 0, the next frames are parsed on the background thread
+        and at most `prefetch` frames wait in the queue.
+        """
+        prefetch = self._prefetch if prefetch is None else prefetch
+        try:
+            if prefetch:
+                yield from self._prefetch_frames(frames=frames, depth=prefetch)
+            else:
+                for frame in self.opener.iter_frames(frames=frames):
+                    self.update_data()
+                    yield frame
+        finally:
+            self.reset()  # Reset the database
+
+    # The clone of the opener parses the frames on the background thread, the state of each frame is moved to this opener
+    def _prefetch_frames(self, frames, depth: int):
+        cursor = self.opener.clone()
+        states = ((frame, cursor.get_state()) for frame in cursor.iter_frames(frames=frames))
+        for frame, state in Prefetcher(iterator=states, depth=depth):
+            self.opener.set_state(state)
+            self.update_data()
+            yield frame
+
     def reset(self):
         self.move_frame(0)
 
@@ -178,11 +390,28 @@ class Brewery:
         _writer.write(start=start, end=end, step=step)
 
     def _match_fmt_with_opener(self, fmt, **kwrgs):
+        paths = self._path if isinstance(self._path, list) else [self._path]
         if fmt == "auto":
-            fmt = self._path.split("/")[-1].split(".")[-1].lower()
+            fmt = strip_compression_suffix(path=paths[0]).split("/")[-1].split(".")[-1].lower()
         trj_opener = get_opener(fmt=fmt)
         if trj_opener.is_require_gro:
             gro_file = kwrgs.pop("gro", None)
             assert gro_file is not None, f"{fmt} require gro file, plz input with 'gro=path_of_gro'"
-            return trj_opener(path=self._path, gro=gro_file)
-        return trj_opener(path=self._path)
+            kwrgs["gro"] = gro_file
+        if not isinstance(self._path, list):
+            return trj_opener(path=self._path, **kwrgs)
+        openers = [trj_opener(path=path, **kwrgs) for path in paths]
+        return MultiOpener(openers=openers, drop_duplicates=kwrgs.get("drop_duplicates", False))
+
+
+def _make_block(shape: tuple, dtype, memmap: str = None):
+    if memmap is None:
+        return np.empty(shape, dtype=dtype)
+    return np.lib.format.open_memmap(memmap, mode="w+", dtype=dtype, shape=shape)
+
+
+# The values can be np.ndarray (atoms of dcd), so they are not compared with ==
+def _is_same_kwrgs(kwrgs_a: dict, kwrgs_b: dict):
+    if kwrgs_a.keys() != kwrgs_b.keys():
+        return False
+    return all(np.array_equal(kwrgs_a[key], kwrgs_b[key]) for key in kwrgs_a)
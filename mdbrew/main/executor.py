@@ -0,0 +1,66 @@
+import os
+import numpy as np
+from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+# Worker function of this process, it is sent once per process by the initializer
+_worker = None
+
+
+def _init_worker(worker):
+    global _worker
+    _worker = worker
+
+
+def _run_worker(frames):
+    return _worker(frames)
+
+
+def split_frames(frames, n_chunks: int):
+    """Split the frames into at most `n_chunks` contiguous chunks, the empty chunks are dropped"""
+    frames = np.asarray(frames, dtype=np.int64)
+    return [chunk for chunk in np.array_split(frames, max(1, min(n_chunks, len(frames)))) if len(chunk)]
+
+
+class FrameExecutor:
+    """FrameExecutor
+
+    Run `worker(frames)` on the chunks of the frames in the worker processes.
+    The worker (e.g. the bound method of the analysis) is pickled once per
+    process, so each process has its own opener and seeks the frames of its
+    chunks through the frame index. The partial results are returned to the
+    parent to be reduced.
+
+    Parameters
+    ------------
+    n_jobs : int
+        Number of the processes, -1 is the number of the cpus
+    chunks_per_job : int
+        Chunks of each process, the more chunks balance the load better
+
+    ## Sum of the partial results
+    >>> executor = FrameExecutor(n_jobs=16)
+    >>> total = sum(executor.map(worker, frames=range(0, 10000, 10)))
+    """
+
+    def __init__(self, n_jobs: int = -1, chunks_per_job: int = 4) -> None:
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else int(n_jobs)
+        assert self.n_jobs > 0, "n_jobs should be larger than 0 or -1"
+        self.chunks_per_job = chunks_per_job
+
+    def map(self, worker, frames, *, verbose: bool = False, **kwrgs_tqdm):
+        """Return the results of the chunks in the order of the frames"""
+        chunks = split_frames(frames=frames, n_chunks=self.n_jobs * self.chunks_per_job)
+        results = [None] * len(chunks)
+        n_jobs = min(self.n_jobs, len(chunks))
+        if not n_jobs:
+            return results
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(worker,)) as executor:
+            futures = {executor.submit(_run_worker, chunk): idx for idx, chunk in enumerate(chunks)}
+            completed = as_completed(futures)
+            if verbose:
+                completed = tqdm(completed, total=len(futures), **kwrgs_tqdm)
+            for future in completed:
+                results[futures[future]] = future.result()
+        return results
@@ -0,0 +1,156 @@
+import os
+import struct
+import numpy as np
+from mdbrew.main.frame import Frame
+from mdbrew.main.interface import OpenerInterface, FrameIndex
+
+DIM = 3
+HEADER_SIZE = 84
+FLOAT_SIZE = 4
+CELL_SIZE = 6 * 8
+MARKER_SIZE = 4
+CELL_BOX_IDX = [0, 2, 5]  # A, B, C in the unit cell record (A, gamma, B, beta, alpha, C)
+
+
+class dcdOpener(OpenerInterface):
+    read_mode = "rb"
+    fmt: str = "dcd"
+
+    def __init__(self, path: str, *args, **kwrgs) -> None:
+        super().__init__(path, *args, **kwrgs)
+        assert self.compression is None, "dcd is read with mmap, plz decompress the file"
+        self._read_header()
+        self.column = ["id", "x", "y", "z"]
+        self._topology = {"id": np.arange(1, self.atom_num + 1)}
+        atoms = kwrgs.get("atoms", None)
+        if atoms is not None:
+            assert len(atoms) == self.atom_num, f"atoms should have {self.atom_num} elements"
+            self.column.insert(1, "atom")
+            self._topology["atom"] = np.asarray(atoms, dtype=str)
+        else:
+            self.atom_keyword = "id"
+
+    @property
+    def memmap(self):
+        if not hasattr(self, "_memmap"):
+            self._map_frames()
+        return self._memmap
+
+    @property
+    def coords_memmap(self):
+        """(F, N, 3) view of the coordinates of every frame, nothing is read until it is used"""
+        if not hasattr(self, "_coords_memmap"):
+            self._map_frames()
+        return self._coords_memmap
+
+    # The views on the file and the index are made again from the header in the other process
+    def __getstate__(self):
+        state = super().__getstate__()
+        for attr in ("_memmap", "_coords_memmap", "_cells_memmap", "_frame_index"):
+            state.pop(attr, None)
+        return state
+
+    # The frames have the fixed stride, so the index is calculated without the scan
+    def load_frame_index(self):
+        self._map_frames()
+        frame_index = FrameIndex()
+        n_frames = len(self._coords_memmap)
+        boxes = self._cells_memmap[:, CELL_BOX_IDX] if self._is_cell else [[]] * n_frames
+        frame_index.extend(
+            offsets=self.skip_head + self._stride * np.arange(n_frames),
+            atom_nums=np.full(n_frames, self.atom_num),
+            boxes=boxes,
+            end=self.skip_head + self._stride * n_frames,
+            steps=self._istart + self._nsavc * np.arange(n_frames),
+        )
+        frame_index.column = list(self.column)
+        return frame_index
+
+    # Abstract data
+    def _make_one_frame_data(self, file):
+        offset = file.tell()
+        frame = (offset - self.skip_head) // self._stride
+        if frame >= len(self.coords_memmap):
+            # The file is grown after it is mapped
+            self._map_frames()
+        if frame >= len(self._coords_memmap):
+            raise EOFError("Unexpected end of file")
+        if self._is_cell:
+            self.box_size = self._cells_memmap[frame, CELL_BOX_IDX].astype(float)
+        file.seek(offset + self._stride)
+        return Frame(
+            numeric=self._coords_memmap[frame],
+            numeric_columns=self.column[-DIM:],
+            topology=self._topology,
+            columns=self.column,
+        )
+
+    def _scan_one_frame(self, file):
+        frame = (file.tell() - self.skip_head) // self._stride
+        box_size = []
+        if self._is_cell:
+            file.seek(MARKER_SIZE, os.SEEK_CUR)
+            box_size = np.frombuffer(file.read(CELL_SIZE), dtype=f"{self._arrow}f8")[CELL_BOX_IDX].tolist()
+            file.seek(MARKER_SIZE, os.SEEK_CUR)
+        block_size = self._stride - (self._cell_record_size if self._is_cell else 0)
+        if file.seek(block_size, os.SEEK_CUR) > os.fstat(file.fileno()).st_size:
+            raise EOFError("Unexpected end of file")
+        return self.atom_num, box_size, self._istart + self._nsavc * frame
+
+    def _read_header(self):
+        with open(file=self.path, mode="rb") as file:
+            marker = file.read(MARKER_SIZE)
+            for arrow in ("<", ">"):
+                if struct.unpack(f"{arrow}i", marker)[0] == HEADER_SIZE:
+                    self._arrow = arrow
+                    break
+            else:
+                raise ValueError("I can not open this file, the first record should be 84 bytes")
+            header = self._read_record(file=file, size=HEADER_SIZE)
+            assert header[:4] == b"CORD", ValueError("Unknown format")
+            icntrl = struct.unpack(f"{self._arrow}20i", header[4:])
+            is_charmm = icntrl[19] != 0
+            assert icntrl[8] == 0, "Fixed atoms are not supported"
+            self._is_cell = is_charmm and icntrl[10] != 0
+            self._is_4d = is_charmm and icntrl[11] != 0
+            self._istart, self._nsavc = icntrl[1], icntrl[2]
+            self.title = self._read_record(file=file)
+            self.atom_num = struct.unpack(f"{self._arrow}i", self._read_record(file=file))[0]
+            self.skip_head = file.tell()
+        self._cell_record_size = CELL_SIZE + 2 * MARKER_SIZE
+        self._coord_record_size = self.atom_num * FLOAT_SIZE + 2 * MARKER_SIZE
+        self._stride = (DIM + self._is_4d) * self._coord_record_size + self._is_cell * self._cell_record_size
+
+    # Fortran record, the size is given by the leading marker if it is not read yet
+    def _read_record(self, file, size: int = None):
+        if size is None:
+            size = struct.unpack(f"{self._arrow}i", file.read(MARKER_SIZE))[0]
+        data = file.read(size)
+        assert struct.unpack(f"{self._arrow}i", file.read(MARKER_SIZE))[0] == size, "Broken record"
+        return data
+
+    # Make the strided views on the file, x, y and z records become one (N, 3) array of each frame
+    def _map_frames(self):
+        self._memmap = np.memmap(self.path, dtype=np.uint8, mode="r")
+        n_frames = max((len(self._memmap) - self.skip_head) // self._stride, 0)
+        if not n_frames:
+            self._coords_memmap = np.empty((0, self.atom_num, DIM), dtype=f"{self._arrow}f4")
+            self._cells_memmap = np.empty((0, CELL_SIZE // 8), dtype=f"{self._arrow}f8")
+            return
+        cell_size = self._cell_record_size if self._is_cell else 0
+        self._coords_memmap = np.ndarray(
+            shape=(n_frames, self.atom_num, DIM),
+            dtype=f"{self._arrow}f4",
+            buffer=self._memmap,
+            offset=self.skip_head + cell_size + MARKER_SIZE,
+            strides=(self._stride, FLOAT_SIZE, self._coord_record_size),
+        )
+        if not self._is_cell:
+            return
+        self._cells_memmap = np.ndarray(
+            shape=(n_frames, CELL_SIZE // 8),
+            dtype=f"{self._arrow}f8",
+            buffer=self._memmap,
+            offset=self.skip_head + MARKER_SIZE,
+            strides=(self._stride, 8),
+        )
@@ -1,15 +1,25 @@
-from mdbrew.main.interface.opener import OpenerInterface
+import re
+import numpy as np
+from mdbrew.main.frame import DEFAULT_DATA_TYPES
+from mdbrew.main.interface.opener import OpenerInterface, skip_binary_lines, read_binary_lines
+from mdbrew.main.interface.compression import open_file
 
 
 GRO_COLUMNS = ["resid", "atom", "id", "x", "y", "z", "vx", "vy", "vz"]
+step_matcher = re.compile(rb"\bstep=\s*(?P<step>\d+)")
+time_matcher = re.compile(rb"\bt=\s*(?P<time>[-+.0-9eE]+)")
 
 
 def _read_gro_file(gro, idx: int = 3):
-    with open(file=gro, mode="r") as file:
+    with open_file(path=gro, mode="r") as file:
         database = _make_gro_data(file=file, idx=idx)[0]
         return database
 
 
+def _make_gro_topology(gro_data, idx: int = 3):
+    return {col: np.array([line[ith] for line in gro_data]).astype(DEFAULT_DATA_TYPES[col]) for ith, col in enumerate(GRO_COLUMNS[:idx])}
+
+
 def _make_gro_data(file, idx: int = 3):
     title = file.readline()
     num_atom = int(file.readline().strip())
@@ -18,15 +28,38 @@ def _make_gro_data(file, idx: int = 3):
     return data, box_line, num_atom
 
 
+# The title of gro written by gmx has 't= ... step= ...'
+def _find_gro_step(title: bytes):
+    if (step := re.search(step_matcher, title)) is not None:
+        return int(step["step"])
+    if (time := re.search(time_matcher, title)) is not None:
+        return float(time["time"])
+    return None
+
+
 class groOpener(OpenerInterface):
     fmt: str = "gro"
+    read_mode = "rb"
 
     def __init__(self, path: str, *args, **kwrgs) -> None:
         super().__init__(path, *args, **kwrgs)
         self.column = GRO_COLUMNS
 
     def _make_one_frame_data(self, file):
-        read_data = _make_gro_data(file=file, idx=len(self.column))
-        self.box_size = [float(box) for box in read_data[1].split()]
-        self.total_line_num = read_data[2] + 3
-        return read_data[0]
+        file.readline()  # Title
+        num_atom = int(file.readline().strip())
+        block = read_binary_lines(file=file, num=num_atom)
+        box_line = file.readline()
+        self.box_size = [float(box) for box in box_line.split()]
+        self.total_line_num = num_atom + 3
+        # The velocities are optional in the gro file
+        self.column = GRO_COLUMNS[: len(block[: block.find(b"\n")].split())]
+        return self._make_frame_from_text(block=block)
+
+    def _scan_one_frame(self, file):
+        title = file.readline()
+        num_atom = int(file.readline().strip())
+        skip_binary_lines(file=file, num=num_atom)
+        box_line = file.readline()
+        assert box_line, "Unexpected end of file"
+        return num_atom, [float(box) for box in box_line.split()], _find_gro_step(title=title)
@@ -1,7 +1,10 @@
+import os
+import mmap
 import struct
 import numpy as np
+from mdbrew.main.frame import Frame
 from mdbrew.main.interface import OpenerInterface
-from .opener_gro import GRO_COLUMNS, _read_gro_file
+from .opener_gro import GRO_COLUMNS, _read_gro_file, _make_gro_topology
 
 GRO_IDX = 3
 
@@ -25,6 +28,10 @@ COLUMNS = (
     "time",
     "lambda",
 )
+# Order of the blocks after the header of each frame
+BLOCK_ORDER = ("ir", "e", "box", "virial", "pressure", "top", "sym", "x", "v", "f")
+SYSTEM_KEYS = ("box", "virial", "pressure")
+MOTION_COLUMNS = {"x": ["x", "y", "z"], "v": ["vx", "vy", "vz"], "f": ["fx", "fy", "fz"]}
 
 
 def check_double(columns_info):
@@ -49,19 +56,38 @@ class trrOpener(OpenerInterface):
 
     def __init__(self, path: str, *args, **kwrgs) -> None:
         super().__init__(path, *args, **kwrgs)
+        assert self.compression is None, "trr is read with mmap, plz decompress the file"
         self._arrow = ">"
         self._dim = DIM
         self._gro_data = _read_gro_file(gro=kwrgs.pop("gro"), idx=GRO_IDX)
+        self._gro_topology = _make_gro_topology(gro_data=self._gro_data, idx=GRO_IDX)
+
+    @property
+    def mmap(self):
+        if not hasattr(self, "_mmap"):
+            self._mmap = self._open_mmap()
+        return self._mmap
 
     # Abstract data
     def _make_one_frame_data(self, file):
         self.total_line_num = 0
         self.columns_info = self._make_columns(file=file)
         self.system_data, self.motion_data = self._make_database(file=file)
-        self.box_size = np.diagonal(self.system_data["box"])
+        self.box_size = np.diagonal(self.system_data["box"]).astype(float)
         self.column = self._transform_columns()
         return self._transform_database(self.motion_data)
 
+    def _scan_one_frame(self, file):
+        columns_info = self._make_columns(file=file)
+        box_size = []
+        file.seek(columns_info["ir_size"] + columns_info["e_size"], os.SEEK_CUR)
+        if columns_info["box_size"]:
+            box_size = np.diagonal(self._read_main_data(file=file, idx=self._dim)).tolist()
+        block_size = sum(columns_info[f"{key}_size"] for key in BLOCK_ORDER[3:])
+        if file.seek(block_size, os.SEEK_CUR) > os.fstat(file.fileno()).st_size:
+            raise EOFError("Unexpected end of file")
+        return columns_info["natoms"], box_size, columns_info["step"]
+
     def _make_columns(self, file):
         info = self._unpack_fmt_and_read_line(file=file, fmt=f"{self._arrow}1i")
         tnum = self._unpack_fmt_and_read_line(file=file, fmt=f"{self._arrow}2i")
@@ -79,40 +105,60 @@ class trrOpener(OpenerInterface):
         return columns_info
 
     def _transform_columns(self):
-        column_dict = {"x_size": "", "v_size": "v", "f_size": "f"}
-        xyz_list = ["x", "y", "z"]
         columns = GRO_COLUMNS[:GRO_IDX]
-        for key, word in column_dict.items():
-            if self.columns_info[key]:
-                for xyz in xyz_list[: self._dim]:
-                    columns.append(word + xyz)
+        for key in self.motion_data:
+            columns.extend(MOTION_COLUMNS[key][: self._dim])
         return columns
 
+    # Map the blocks of this frame without reading them, the blocks which are not required are skipped
     def _make_database(self, file):
         system_data = {}
         motion_data = {}
-        for key in ("box", "virial", "pressure"):
-            column_key = f"{key}_size"
-            if self.columns_info[column_key] != 0:
-                system_data[key] = self._read_main_data(file=file, idx=self._dim)
-
-        for key in ("x", "v", "f"):
-            column_key = f"{key}_size"
-            if self.columns_info[column_key] != 0:
-                motion_data[key] = self._read_main_data(file=file, idx=self.columns_info["natoms"])
-
+        offset = file.tell()
+        for key in BLOCK_ORDER:
+            size = self.columns_info[f"{key}_size"]
+            if not size:
+                continue
+            if key in SYSTEM_KEYS:
+                system_data[key] = self._map_main_data(offset=offset, idx=self._dim)
+            elif key in MOTION_COLUMNS and self._is_required(key):
+                motion_data[key] = self._map_main_data(offset=offset, idx=self.columns_info["natoms"])
+            offset += size
+        self.total_line_num += offset - file.tell()
+        file.seek(offset)
         return system_data, motion_data
 
     def _transform_database(self, motion_data: dict):
-        gro_data = self._gro_data
-        val_data = np.hstack([val for key, val in motion_data.items()])
-        return np.hstack([gro_data, val_data])
+        return Frame(
+            numeric=list(motion_data.values()),
+            numeric_columns=self.column[GRO_IDX:],
+            topology=self._gro_topology,
+            columns=self.column,
+        )
+
+    def _is_required(self, key):
+        return self.fields is None or any(col in self.fields for col in MOTION_COLUMNS[key])
+
+    def _map_main_data(self, offset, idx):
+        dtype = self._get_dtype()
+        if offset + idx * self._dim * dtype.itemsize > len(self.mmap):
+            # The file is grown after it is mapped
+            self._mmap = self._open_mmap()
+        data = np.frombuffer(self.mmap, dtype=dtype, count=idx * self._dim, offset=offset)
+        return data.reshape([idx, self._dim])
 
     def _read_main_data(self, file, idx):
-        fmt = f"{self._arrow}{idx * self._dim}"
-        fmt += "d" if self._is_double else "f"
-        data = self._unpack_fmt_and_read_line(file=file, fmt=fmt)
-        return np.array(data).reshape([idx, self._dim])
+        dtype = self._get_dtype()
+        size = idx * self._dim * dtype.itemsize
+        self.total_line_num += size
+        return np.frombuffer(file.read(size), dtype=dtype).reshape([idx, self._dim])
+
+    def _get_dtype(self):
+        return np.dtype(f"{self._arrow}f{DOUBLE_SIZE if self._is_double else FLOAT_SIZE}")
+
+    def _open_mmap(self):
+        with open(file=self.path, mode="rb") as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
 
     def _unpack_fmt_and_read_line(self, file, fmt):
         size = struct.calcsize(fmt)
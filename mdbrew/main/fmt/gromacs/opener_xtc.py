@@ -0,0 +1,168 @@
+import os
+import struct
+import numpy as np
+from mdbrew.main.frame import Frame
+from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_bytes
+from mdbrew.tool.space import _kernel
+from .opener_gro import GRO_COLUMNS, _read_gro_file, _make_gro_topology
+
+GRO_IDX = 3
+
+MAGIC = 1995
+DIM = 3
+FIRSTIDX = 9
+MAGICINTS = (
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 8, 10, 12, 16, 20, 25, 32, 40, 50, 64,
+    80, 101, 128, 161, 203, 256, 322, 406, 512, 645, 812, 1024, 1290,
+    1625, 2048, 2580, 3250, 4096, 5060, 6501, 8192, 10321, 13003,
+    16384, 20642, 26007, 32768, 41285, 52015, 65536, 82570, 104031,
+    131072, 165140, 208063, 262144, 330280, 416127, 524287, 660561,
+    832255, 1048576, 1321122, 1664510, 2097152, 2642245, 3329021,
+    4194304, 5284491, 6658042, 8388607, 10568983, 13316085, 16777216,
+)  # fmt: skip
+
+
+class _BitReader:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def receivebits(self, num_of_bits: int) -> int:
+        pos = self.pos
+        start = pos >> 3
+        end = (pos + num_of_bits + 7) >> 3
+        self.pos = pos + num_of_bits
+        chunk = int.from_bytes(self.data[start:end], "big")
+        return (chunk >> ((end << 3) - pos - num_of_bits)) & ((1 << num_of_bits) - 1)
+
+    def receiveints(self, num_of_bits: int, sizes):
+        value = self.receivebits(num_of_bits)
+        # The bytes are sent from the lowest one, the last byte can be shorter than 8 bits
+        num_of_bytes, rest_bits = divmod(num_of_bits, 8)
+        number = int.from_bytes((value >> rest_bits).to_bytes(num_of_bytes, "big"), "little")
+        number |= (value & ((1 << rest_bits) - 1)) << (8 * num_of_bytes)
+        number, z = divmod(number, sizes[2])
+        x, y = divmod(number, sizes[1])
+        return x, y, z
+
+
+# Decode the compressed coordinates of xdr3dfcoord (xdrfile.c), the compiled kernel is used if numba is installed
+def _decompress_coords(data: bytes, natoms: int, precision: float, minint, maxint, smallidx: int, kernel: str = None):
+    if _kernel.check_kernel(kernel=kernel) == "numba":
+        int_coords = _kernel.decompress_xtc(data, natoms, minint, maxint, smallidx, MAGICINTS, FIRSTIDX)
+    else:
+        int_coords = _decompress_int_coords(data, natoms, minint, maxint, smallidx)
+    inv_precision = np.float32(1.0 / precision)
+    return np.asarray(int_coords, dtype=np.float32).reshape([natoms, DIM]) * inv_precision
+
+
+def _decompress_int_coords(data: bytes, natoms: int, minint, maxint, smallidx: int):
+    reader = _BitReader(data=data)
+    sizeint = [maxint[i] - minint[i] + 1 for i in range(DIM)]
+    if (sizeint[0] | sizeint[1] | sizeint[2]) > 0xFFFFFF:
+        bitsizeint = [size.bit_length() for size in sizeint]
+        bitsize = 0
+    else:
+        bitsize = (sizeint[0] * sizeint[1] * sizeint[2]).bit_length()
+    smaller = MAGICINTS[max(FIRSTIDX, smallidx - 1)] // 2
+    smallnum = MAGICINTS[smallidx] // 2
+    sizesmall = (MAGICINTS[smallidx],) * DIM
+
+    int_coords = []
+    i = 0
+    run = 0
+    while i < natoms:
+        if bitsize == 0:
+            x, y, z = (reader.receivebits(bitsizeint[k]) for k in range(DIM))
+        else:
+            x, y, z = reader.receiveints(bitsize, sizeint)
+        i += 1
+        px, py, pz = x + minint[0], y + minint[1], z + minint[2]
+
+        is_smaller = 0
+        if reader.receivebits(1):
+            run = reader.receivebits(5)
+            is_smaller = run % 3
+            run -= is_smaller
+            is_smaller -= 1
+        if run > 0:
+            for k in range(0, run, 3):
+                x, y, z = reader.receiveints(smallidx, sizesmall)
+                i += 1
+                x, y, z = x + px - smallnum, y + py - smallnum, z + pz - smallnum
+                if k == 0:
+                    # The first and second atoms are interchanged for the better compression of water
+                    int_coords.extend((x, y, z, px, py, pz))
+                else:
+                    int_coords.extend((x, y, z))
+                px, py, pz = x, y, z
+        else:
+            int_coords.extend((px, py, pz))
+
+        smallidx += is_smaller
+        if is_smaller < 0:
+            smallnum = smaller
+            smaller = MAGICINTS[smallidx - 1] // 2 if smallidx > FIRSTIDX else 0
+        elif is_smaller > 0:
+            smaller = smallnum
+            smallnum = MAGICINTS[smallidx] // 2
+        sizesmall = (MAGICINTS[smallidx],) * DIM
+    return int_coords
+
+
+class xtcOpener(OpenerInterface):
+    is_require_gro = True
+    read_mode = "rb"
+    fmt: str = "xtc"
+
+    def __init__(self, path: str, *args, **kwrgs) -> None:
+        super().__init__(path, *args, **kwrgs)
+        self._arrow = ">"
+        self._dim = DIM
+        self._gro_data = _read_gro_file(gro=kwrgs.pop("gro"), idx=GRO_IDX)
+        self._gro_topology = _make_gro_topology(gro_data=self._gro_data, idx=GRO_IDX)
+        self.column = GRO_COLUMNS[:GRO_IDX] + ["x", "y", "z"]
+
+    # Abstract data
+    def _make_one_frame_data(self, file):
+        natoms, self.step, self.time, box = self._read_header(file=file)
+        self.box_size = np.diagonal(box).astype(float)
+        coords = self._read_coords(file=file, natoms=natoms)
+        return Frame(numeric=coords, numeric_columns=self.column[GRO_IDX:], topology=self._gro_topology, columns=self.column)
+
+    def _scan_one_frame(self, file):
+        natoms, step, time, box = self._read_header(file=file)
+        (lsize,) = self._unpack(file=file, fmt="1i")
+        if lsize <= 9:
+            size = lsize * self._dim * 4
+        else:
+            file.seek(32, os.SEEK_CUR)
+            (byte_size,) = self._unpack(file=file, fmt="1i")
+            size = byte_size + (-byte_size % 4)
+        skip_binary_bytes(file=file, size=size)
+        return natoms, np.diagonal(box).tolist(), step
+
+    def _read_header(self, file):
+        magic, natoms, step = self._unpack(file=file, fmt="3i")
+        assert magic == MAGIC, "I can not open this file"
+        (time,) = self._unpack(file=file, fmt="1f")
+        box = np.array(self._unpack(file=file, fmt=f"{self._dim**2}f")).reshape([self._dim, self._dim])
+        return natoms, step, time, box
+
+    def _read_coords(self, file, natoms):
+        (lsize,) = self._unpack(file=file, fmt="1i")
+        assert lsize == natoms, "Number of atoms is not matched"
+        if lsize <= 9:
+            return np.array(self._unpack(file=file, fmt=f"{lsize * self._dim}f"), dtype=np.float32).reshape([lsize, self._dim])
+        (precision,) = self._unpack(file=file, fmt="1f")
+        minint = self._unpack(file=file, fmt="3i")
+        maxint = self._unpack(file=file, fmt="3i")
+        (smallidx,) = self._unpack(file=file, fmt="1i")
+        (byte_size,) = self._unpack(file=file, fmt="1i")
+        data = file.read(byte_size + (-byte_size % 4))
+        return _decompress_coords(data=data, natoms=lsize, precision=precision, minint=minint, maxint=maxint, smallidx=smallidx)
+
+    def _unpack(self, file, fmt):
+        fmt = f"{self._arrow}{fmt}"
+        return struct.unpack(fmt, file.read(struct.calcsize(fmt)))
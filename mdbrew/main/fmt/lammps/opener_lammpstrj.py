@@ -1,4 +1,5 @@
 from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_lines, read_binary_lines
 
 
 def skip_line(file, num):
@@ -8,6 +9,7 @@ def skip_line(file, num):
 
 class lammpstrjOpener(OpenerInterface):
     fmt: str = "lammpstrj"
+    read_mode = "rb"
     is_require_atomdict = True
 
     def __init__(self, path: str, *args, **kwrgs) -> None:
@@ -19,6 +21,16 @@ class lammpstrjOpener(OpenerInterface):
         atom_num = int(file.readline().split()[0])
         skip_line(file=file, num=1)
         self.box_size = [float(line.split()[1]) - float(line.split()[0]) for line in (file.readline() for _ in range(3))]
-        self.column = file.readline().split()[2:]
+        self.column = file.readline().decode().split()[2:]
         self.total_line_num = 9 + atom_num
-        return [file.readline().split() for _ in range(atom_num)]
+        return self._make_frame_from_text(block=read_binary_lines(file=file, num=atom_num))
+
+    def _scan_one_frame(self, file):
+        skip_binary_lines(file=file, num=1)
+        step = int(file.readline())
+        skip_binary_lines(file=file, num=1)
+        atom_num = int(file.readline().split()[0])
+        skip_binary_lines(file=file, num=1)
+        box_size = [float(line.split()[1]) - float(line.split()[0]) for line in (file.readline() for _ in range(3))]
+        skip_binary_lines(file=file, num=1 + atom_num)
+        return atom_num, box_size, step
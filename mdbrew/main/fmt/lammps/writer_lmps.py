@@ -7,19 +7,20 @@ class lmpWriter(WriterInterface):
 
     def _write_one_frame_data(self, file: TextIO, idx: int):
         lines = []
+        topology = self._brewery.topology
         title_line = f"Atom Count: "
-        title_line += " ".join([f"{atom}:{num}" for atom, num in zip(self._brewery.atom_info[0], self._brewery.atom_info[1])])
+        title_line += " ".join([f"{atom}:{num}" for atom, num in zip(topology.kinds, topology.counts)])
         lines.append(title_line)
         lines.append("")
-        lines.append(f"{self._brewery.atom_num} atoms")
-        lines.append(f"{len(self._brewery.atom_kind)} atom types")
+        lines.append(f"{topology.atom_num} atoms")
+        lines.append(f"{len(topology.kinds)} atom types")
         lines.append("")
         for box, axis in zip(self._brewery.box_size, ["x", "y", "z"]):
             lines.append(f"0 {box} {axis}lo {axis}hi")
         lines.append("")
         lines.append("Atoms # atomic")
         lines.append("")
-        type_list = self.__make_type_list()
+        type_list = self.__make_type_list(topology=topology)
         coords = self._brewery.coords * self._scaling
         for i, coords in enumerate(coords):
             lines.append(f"{i + 1} {type_list[i]} {coords[0]} {coords[1]} {coords[2]}")
@@ -29,8 +30,8 @@ class lmpWriter(WriterInterface):
     def _check_require_atom_dict(self):
         return self._brewery.fmt != "lammpstrj"
 
-    def __make_type_list(self):
+    def __make_type_list(self, topology):
         if "lammpstrj" == self._brewery.fmt:
-            return self._brewery.atoms
+            return topology.atoms
         inverse_atom_dict = {str(atom): int(idx) for idx, atom in self._atom_dict.items()}
-        return [inverse_atom_dict[atom] for atom in self._brewery.atoms]
+        return topology.map_kinds(kind_dict=inverse_atom_dict)
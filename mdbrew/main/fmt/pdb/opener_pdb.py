@@ -1,4 +1,5 @@
 from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_lines
 
 
 atomic_dict = {
@@ -23,6 +24,7 @@ atomic_dict = {
 
 class pdbOpener(OpenerInterface):
     ending_num_for_pdb = None
+    atom_line_num_for_pdb = None
     is_column_updated = False
     fmt: str = "pdb"
 
@@ -54,9 +56,22 @@ class pdbOpener(OpenerInterface):
         else:
             self.total_line_num += self.ending_num_for_pdb
             one_frame_data = [self.apply_atom_type(file.readline()) for _ in range(self.ending_num_for_pdb)]
-            file.readline()
+            assert "END" in file.readline(), "Unexpected end of file"
         return one_frame_data
 
+    def _scan_one_frame(self, file):
+        assert b"REMARK" in file.readline()
+        box_size = [float(box_length) for box_length in file.readline().split()[1:4]]
+        if self.atom_line_num_for_pdb is None:
+            atom_line_num = 0
+            while b"END" not in (line := file.readline()):
+                assert line, "Unexpected end of file"
+                atom_line_num += 1
+            self.atom_line_num_for_pdb = atom_line_num
+        else:
+            skip_binary_lines(file=file, num=self.atom_line_num_for_pdb + 1)
+        return self.atom_line_num_for_pdb, box_size, None
+
     def apply_atom_type(self, line):
         data_list = []
         for key, idxes in atomic_dict.items():
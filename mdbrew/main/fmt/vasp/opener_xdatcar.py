@@ -1,4 +1,6 @@
 from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_lines
+from mdbrew.main.interface.compression import open_file
 
 
 class vaspOpener(OpenerInterface):
@@ -28,8 +30,13 @@ class vaspOpener(OpenerInterface):
             database.append(line)
         return database
 
+    def _scan_one_frame(self, file):
+        num_atom = sum(self.atom_kind_num)
+        skip_binary_lines(file=file, num=1 + num_atom)
+        return num_atom, self.box_size, None
+
     def _set_box_and_atom(self, path):
-        with open(path, "r") as raw_file:
+        with open_file(path, "r") as raw_file:
             for i in range(2):
                 raw_file.readline()
             for i in range(3):
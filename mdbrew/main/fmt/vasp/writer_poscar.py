@@ -16,7 +16,7 @@ class POSCARWriter(WriterInterface):
         for i in atom_list:
             file.write(f" {i:3s}")
         file.write("\n")
-        for i in self._brewery.atom_info[1]:
+        for i in self._brewery.topology.counts:
             file.write(f"{i:6d}")
         file.write("\n")
         file.write("Cartesian\n")
@@ -25,9 +25,4 @@ class POSCARWriter(WriterInterface):
             file.write(f"{xyz[0]:24.16f}{xyz[1]:24.16f}{xyz[2]:24.16f}\n")
 
     def _sort_xyz(self):
-        atom_list = self._brewery.brew(self._brewery.opener.atom_keyword, dtype="str")
-        sorted_xyz = np.zeros((1, 3), dtype="float")
-        for atom in self._brewery.atom_kind:
-            atom_idx = np.where(atom == atom_list)
-            sorted_xyz = np.concatenate((sorted_xyz, self._brewery.coords[atom_idx]))
-        return sorted_xyz[1:]
+        return np.asarray(self._brewery.coords, dtype="float")[self._brewery.topology.order]
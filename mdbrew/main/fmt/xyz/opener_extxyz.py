@@ -1,15 +1,18 @@
 import re
 from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_lines, read_binary_lines
 
 
 box_compiler = re.compile(
     r"Lattice=\"(?P<xx>\S+)\s+(?P<xy>\S+)\s+(?P<xz>\S+)\s+(?P<yx>\S+)\s+(?P<yy>\S+)\s+(?P<yz>\S+)\s+(?P<zx>\S+)\s+(?P<zy>\S+)\s+(?P<zz>\S+)"
 )
 col_matcher = re.compile(r"Properties=(?P<info>\S+)")
+step_matcher = re.compile(r"(?:^|\s)(?:step|time)=\"?(?P<step>[-+.0-9eE]+)", re.IGNORECASE)
 
 
 class extxyzOpener(OpenerInterface):
     fmt: str = "extxyz"
+    read_mode = "rb"
 
     def __init__(self, path: str, *args, **kwrgs) -> None:
         super().__init__(path, *args, **kwrgs)
@@ -18,9 +21,18 @@ class extxyzOpener(OpenerInterface):
         first_loop_line = file.readline()
         atom_num = int(first_loop_line.strip())
         self.total_line_num = atom_num + 2
-        info_line = file.readline()
+        info_line = file.readline().decode()
         self.__update_information(info_line=info_line)
-        return [file.readline().split() for _ in range(atom_num)]
+        return self._make_frame_from_text(block=read_binary_lines(file=file, num=atom_num))
+
+    def _scan_one_frame(self, file):
+        atom_num = int(file.readline().strip())
+        info_line = file.readline().decode()
+        box = re.search(box_compiler, info_line)
+        step = re.search(step_matcher, info_line)
+        skip_binary_lines(file=file, num=atom_num)
+        box_size = [] if box is None else [float(box[key].strip('"')) for key in ("xx", "yy", "zz")]
+        return atom_num, box_size, None if step is None else float(step["step"])
 
     def __update_information(self, info_line: str):
         if not self.column:
@@ -1,8 +1,10 @@
 from mdbrew.main.interface import OpenerInterface
+from mdbrew.main.interface.opener import skip_binary_lines, read_binary_lines
 
 
 class xyzOpener(OpenerInterface):
     fmt: str = "xyz"
+    read_mode = "rb"
 
     def __init__(self, path: str, *args, **kwrgs) -> None:
         super().__init__(path, *args, **kwrgs)
@@ -13,4 +15,9 @@ class xyzOpener(OpenerInterface):
         atom_num = int(first_loop_line.strip())
         file.readline()
         self.total_line_num = atom_num + 2
-        return [file.readline().split() for _ in range(atom_num)]
+        return self._make_frame_from_text(block=read_binary_lines(file=file, num=atom_num))
+
+    def _scan_one_frame(self, file):
+        atom_num = int(file.readline().strip())
+        skip_binary_lines(file=file, num=atom_num + 1)
+        return atom_num, [], None
@@ -0,0 +1,166 @@
+import io
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+
+DEFAULT_DATA_TYPES = {
+    "x": float,
+    "y": float,
+    "z": float,
+    "fx": float,
+    "fy": float,
+    "fz": float,
+    "vx": float,
+    "vy": float,
+    "vz": float,
+    "id": int,
+    "idx": int,
+    "atom": str,
+    "element": str,
+    "resid": str,
+    "type": str,
+}
+
+
+class Frame:
+    """Frame
+
+    Data of one frame, the float columns are saved in (N, k) blocks and the
+    other columns (atom, type, resid, ...) are saved in the topology which is
+    shared with the previous frame when it does not change.
+
+    Parameters
+    ------------
+    numeric : np.ndarray | List[np.ndarray]
+        (N, k) float block, or the list of blocks, of the columns in `numeric_columns`
+    topology : Dict[str, np.ndarray]
+        Non-float columns, each has N elements
+    columns : List[str]
+        Order of the columns in the trajectory
+    """
+
+    def __init__(self, numeric, numeric_columns: List[str], topology: Dict[str, np.ndarray], columns: List[str]):
+        self.blocks = [numeric] if isinstance(numeric, np.ndarray) else list(numeric)
+        self.numeric_columns = list(numeric_columns)
+        self.topology = topology
+        self.columns = list(columns)
+        block_idx = [(ith, idx) for ith, block in enumerate(self.blocks) for idx in range(block.shape[1])]
+        self._numeric_idx = dict(zip(self.numeric_columns, block_idx))
+
+    def __len__(self) -> int:
+        if self.blocks:
+            return len(self.blocks[0])
+        return len(next(iter(self.topology.values())))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the float blocks, the topology is not counted because it is shared between the frames"""
+        return sum(block.nbytes for block in self.blocks)
+
+    @property
+    def numeric(self):
+        return self.blocks[0] if len(self.blocks) == 1 else np.hstack(self.blocks)
+
+    @classmethod
+    def from_rows(cls, rows, columns: List[str], data_types: dict, topology: Dict[str, np.ndarray] = None):
+        rows = np.asarray(rows)
+        types = [data_types.get(col, str) for col in columns]
+        numeric_idx = [idx for idx, dtype in enumerate(types) if dtype is float]
+        numeric = rows[:, numeric_idx].astype(float)
+        new_topology = {col: rows[:, idx].astype(dtype) for idx, (col, dtype) in enumerate(zip(columns, types)) if dtype is not float}
+        if not is_same_topology(topology, new_topology):
+            topology = new_topology
+        return cls(numeric=numeric, numeric_columns=[columns[idx] for idx in numeric_idx], topology=topology, columns=columns)
+
+    @classmethod
+    def from_text(cls, block: bytes, columns: List[str], topology: Dict[str, np.ndarray] = None, fields: List[str] = None):
+        """Parse the whitespace separated lines of one frame at once
+
+        The string columns are parsed only when `topology` is None or when the
+        integer columns (id, idx) are changed from `topology`. If `fields` is
+        given, the other columns are not converted.
+        """
+        selected_idx = [idx for idx, col in enumerate(columns) if fields is None or col in fields]
+        types = {idx: DEFAULT_DATA_TYPES.get(columns[idx], str) for idx in selected_idx}
+        numeric_idx = [idx for idx, dtype in types.items() if dtype is float]
+        int_idx = [idx for idx, dtype in types.items() if dtype is int]
+        str_idx = [idx for idx, dtype in types.items() if dtype is str]
+        values = _load_text_block(block=block, usecols=numeric_idx + int_idx, dtype=float)
+        numeric = np.ascontiguousarray(values[:, : len(numeric_idx)])
+        new_topology = {columns[idx]: values[:, len(numeric_idx) + ith].astype(int) for ith, idx in enumerate(int_idx)}
+        if not _is_reusable_topology(topology, new_topology, str_columns=[columns[idx] for idx in str_idx], atom_num=len(values)):
+            strings = _load_text_block(block=block, usecols=str_idx, dtype=str) if str_idx else None
+            new_topology.update({columns[idx]: strings[:, ith] for ith, idx in enumerate(str_idx)})
+            topology = new_topology
+        return cls(
+            numeric=numeric,
+            numeric_columns=[columns[idx] for idx in numeric_idx],
+            topology=topology,
+            columns=[columns[idx] for idx in selected_idx],
+        )
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame, data_types: dict):
+        columns = list(dataframe.columns)
+        numeric_columns = [col for col in columns if data_types.get(col, str) is float]
+        numeric = dataframe.loc[:, numeric_columns].to_numpy(dtype=float)
+        topology = {col: dataframe[col].to_numpy() for col in columns if col not in numeric_columns}
+        return cls(numeric=numeric, numeric_columns=numeric_columns, topology=topology, columns=columns)
+
+    def get(self, cols=None, dtype=None):
+        if cols is None:
+            cols = self.columns
+        if isinstance(cols, str):
+            return np.asarray(self._get_column(cols), dtype=dtype)
+        if all(col in self._numeric_idx for col in cols):
+            block_idx, idx = zip(*(self._numeric_idx[col] for col in cols))
+            # consecutive columns (x, y, z) are returned as the view of the block
+            if len(set(block_idx)) == 1 and idx == tuple(range(idx[0], idx[0] + len(idx))):
+                return np.asarray(self.blocks[block_idx[0]][:, idx[0] : idx[0] + len(idx)], dtype=dtype)
+            return np.asarray(np.stack([self._get_column(col) for col in cols], axis=1), dtype=dtype)
+        data = np.empty((len(self), len(cols)), dtype=object if dtype is None else dtype)
+        for idx, col in enumerate(cols):
+            data[:, idx] = self._get_column(col)
+        return data
+
+    def take(self, idx, topology: Dict[str, np.ndarray] = None):
+        """Frame of the atoms in `idx`, `topology` is the topology of these atoms if it is already known"""
+        if topology is None:
+            topology = {col: value[idx] for col, value in self.topology.items()}
+        return Frame(numeric=[block[idx] for block in self.blocks], numeric_columns=self.numeric_columns, topology=topology, columns=self.columns)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        data = {col: to_native(self._get_column(col)) for col in self.columns}
+        return pd.DataFrame(data, columns=self.columns)
+
+    def _get_column(self, col: str):
+        if col in self._numeric_idx:
+            block_idx, idx = self._numeric_idx[col]
+            return self.blocks[block_idx][:, idx]
+        if col in self.topology:
+            return self.topology[col]
+        raise KeyError(f"'{col}' is not in columns {tuple(self.columns)}")
+
+
+# pandas requires the native byte order (the binary trajectories are big-endian)
+def to_native(value: np.ndarray):
+    return value.astype(value.dtype.newbyteorder("="), copy=False)
+
+
+def is_same_topology(topology_a: Dict[str, np.ndarray], topology_b: Dict[str, np.ndarray]):
+    if topology_a is None or topology_a.keys() != topology_b.keys():
+        return False
+    return all(np.array_equal(topology_a[col], topology_b[col]) for col in topology_a)
+
+
+def _is_reusable_topology(topology: Dict[str, np.ndarray], int_topology: Dict[str, np.ndarray], str_columns: List[str], atom_num: int):
+    if topology is None or topology.keys() != set(int_topology) | set(str_columns):
+        return False
+    if any(len(value) != atom_num for value in topology.values()):
+        return False
+    return all(np.array_equal(topology[col], int_topology[col]) for col in int_topology)
+
+
+def _load_text_block(block: bytes, usecols: List[int], dtype):
+    return np.loadtxt(io.BytesIO(block), usecols=usecols, dtype=dtype, ndmin=2, comments=None)
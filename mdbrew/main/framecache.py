@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+class FrameCache:
+    """FrameCache
+
+    LRU cache of the parsed frames keyed by the frame index, the least recently
+    used frames are dropped when the frames are larger than `max_bytes`.
+
+    Parameters
+    ------------
+    max_bytes : int
+        Budget of the cache in bytes, counted with `nbytes` of the frames
+
+    ## Size of the cache
+    >>> brewery = Brewery(trj_file, cache_bytes=2**30)
+    >>> ...
+    >>> brewery.cache.hits, brewery.cache.misses, brewery.cache.nbytes
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        assert max_bytes > 0, "max_bytes should be larger than 0"
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, frame: int) -> bool:
+        return frame in self._items
+
+    def __str__(self) -> str:
+        return (
+            f"FrameCache(frames={len(self)}, nbytes={self.nbytes}, max_bytes={self.max_bytes}, "
+            f"hits={self.hits}, misses={self.misses}, hit_rate={self.hit_rate:.3f})"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, frame: int):
+        """Return the item of the frame or None, the hit and the miss are counted"""
+        if frame not in self._items:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(frame)
+        return self._items[frame][0]
+
+    def put(self, frame: int, item, nbytes: int):
+        if frame in self._items:
+            self.nbytes -= self._items.pop(frame)[1]
+        # The frame larger than the budget is not kept
+        if nbytes > self.max_bytes:
+            return
+        self._items[frame] = (item, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, old_nbytes) = self._items.popitem(last=False)
+            self.nbytes -= old_nbytes
+
+    def clear(self):
+        self._items.clear()
+        self.nbytes = 0
+
+    def reset_counters(self):
+        self.hits = self.misses = 0
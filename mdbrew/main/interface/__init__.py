@@ -1,4 +1,6 @@
 from .opener import opener_programs, OpenerInterface
+from .frameindex import FrameIndex
+from .multiopener import MultiOpener
 from .writer import writer_programs, WriterInterface
 
 
@@ -9,6 +11,8 @@ __all__ = [
     "writer_programs",
     "OpenerInterface",
     "WriterInterface",
+    "FrameIndex",
+    "MultiOpener",
 ]
 
 
@@ -0,0 +1,270 @@
+import io
+import os
+import bisect
+import lzma
+import zlib
+import struct
+import threading
+
+
+RAW_CHUNK_SIZE = 1 << 18
+CHECKPOINT_SIZE = 1 << 24
+MAGIC_NUMBERS = {
+    "gzip": b"\x1f\x8b",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+SUFFIXES = {".gz": "gzip", ".xz": "xz", ".zst": "zstd"}
+ZSTD_SKIPPABLE_MAGIC = (0x184D2A50, 0x184D2A5F)
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+ZSTD_SEEKABLE_FOOTER_SIZE = 9
+
+
+def get_compression(path: str):
+    """Return the compression of the file ('gzip', 'xz', 'zstd') from its magic number, None if not compressed"""
+    with open(file=path, mode="rb") as file:
+        head = file.read(max(len(magic) for magic in MAGIC_NUMBERS.values()))
+    for compression, magic in MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def strip_compression_suffix(path: str):
+    """'traj.xyz.gz' -> 'traj.xyz'"""
+    root, ext = os.path.splitext(path)
+    return root if ext.lower() in SUFFIXES else path
+
+
+def open_file(path: str, mode: str = "r", checkpoints=None):
+    """Open the trajectory, the compressed file is decompressed while it is read
+
+    `checkpoints` can be shared between the file objects of the same path, so
+    that the seek of the new file object starts from the nearest checkpoint.
+    """
+    compression = get_compression(path=path)
+    if compression is None:
+        return open(file=path, mode=mode)
+    raw_file = CompressedFile(path=path, compression=compression, checkpoints=checkpoints)
+    file = io.BufferedReader(raw_file, buffer_size=io.DEFAULT_BUFFER_SIZE)
+    return file if "b" in mode else io.TextIOWrapper(file)
+
+
+def _make_decompressor(compression: str):
+    if compression == "gzip":
+        return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    elif compression == "xz":
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    elif compression == "zstd":
+        return _import_zstandard().ZstdDecompressor().decompressobj()
+    raise ValueError(f"'{compression}' is not supported")
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstandard is required for '.zst' files, plz install with 'pip install zstandard'")
+    return zstandard
+
+
+class Checkpoints:
+    """Checkpoints
+
+    State of the decompressor at some positions of the decompressed file, the
+    read after the seek starts from the last checkpoint before the position.
+    At the boundary of gzip members, xz streams and zstd frames the state is
+    None (new decompressor), else it is the copy of the decompressor (gzip only).
+    The checkpoints can be added by the readers on the other threads.
+
+    Parameters
+    ------------
+    checkpoint_size : int
+        Minimum distance between the checkpoints in the decompressed bytes
+    """
+
+    def __init__(self, checkpoint_size: int = CHECKPOINT_SIZE) -> None:
+        self.checkpoint_size = checkpoint_size
+        self.positions = [0]
+        self.raw_positions = [0]
+        self.states = [None]
+        self.end = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    # The copies of the decompressor can not be pickled, only the boundaries of the streams are sent to the other process
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        checkpoints = [checkpoint for checkpoint in zip(self.positions, self.raw_positions, self.states) if checkpoint[2] is None]
+        state["positions"], state["raw_positions"], state["states"] = map(list, zip(*checkpoints))
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def is_due(self, position: int) -> bool:
+        return position - self.positions[-1] >= self.checkpoint_size
+
+    def add(self, position: int, raw_position: int, state):
+        with self._lock:
+            if position <= self.positions[-1]:
+                return
+            self.positions.append(position)
+            self.raw_positions.append(raw_position)
+            self.states.append(state)
+
+    def find(self, position: int):
+        with self._lock:
+            idx = bisect.bisect_right(self.positions, position) - 1
+            return self.positions[idx], self.raw_positions[idx], self.states[idx]
+
+
+class CompressedFile(io.RawIOBase):
+    """CompressedFile
+
+    Seekable read-only file of the decompressed data, the data is decompressed
+    chunk by chunk and only the last chunk is kept in the memory.
+    """
+
+    def __init__(self, path: str, compression: str, checkpoints: Checkpoints = None) -> None:
+        self.path = path
+        self.compression = compression
+        self.checkpoints = Checkpoints() if checkpoints is None else checkpoints
+        self._raw = open(file=path, mode="rb")
+        if compression == "zstd" and len(self.checkpoints) == 1:
+            self._read_zstd_seek_table()
+        self._restore(position=0, raw_position=0, state=None)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self):
+        if not self.closed:
+            self._raw.close()
+        super().close()
+
+    def tell(self) -> int:
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        while self._position >= self._buffer_end:
+            if not self._decompress_chunk():
+                return 0
+        start = self._position - self._buffer_start
+        size = min(len(buffer), self._buffer_end - self._position)
+        buffer[:size] = self._buffer[start : start + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        """Move to the position, the position is clipped at the end of file"""
+        if whence == os.SEEK_SET:
+            position = offset
+        elif whence == os.SEEK_CUR:
+            position = self._position + offset
+        elif whence == os.SEEK_END:
+            position = self._find_end() + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        assert position >= 0, f"Negative seek position {position}"
+        if position < self._buffer_start or position > self._buffer_end:
+            checkpoint = self.checkpoints.find(position=position)
+            if position < self._buffer_start or checkpoint[0] > self._buffer_end:
+                self._restore(*checkpoint)
+            while self._buffer_end < position and self._decompress_chunk():
+                pass
+        self._position = min(position, self._buffer_end)
+        return self._position
+
+    def _find_end(self):
+        if self.checkpoints.end is None:
+            while self._decompress_chunk():
+                pass
+        return self.checkpoints.end
+
+    def _restore(self, position: int, raw_position: int, state):
+        self._raw.seek(raw_position)
+        self._decompressor = None if state is None else state.copy()
+        self._pending = b""
+        self._buffer = b""
+        self._buffer_start = self._buffer_end = self._position = position
+
+    # Decompress the next raw chunk into the buffer, return False at the end of file
+    def _decompress_chunk(self):
+        while True:
+            data = self._pending or self._raw.read(RAW_CHUNK_SIZE)
+            self._pending = b""
+            if self._decompressor is None:
+                data = self._skip_padding(data=data)
+                if not data:
+                    self.checkpoints.end = self._buffer_end
+                    return False
+                self._decompressor = _make_decompressor(compression=self.compression)
+            elif not data:
+                raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+            output = self._decompressor.decompress(data)
+            if self._decompressor.eof:
+                self._pending = self._decompressor.unused_data
+                self._decompressor = None
+            if output or self._decompressor is None:
+                break
+        self._buffer = output
+        self._buffer_start = self._buffer_end
+        self._buffer_end += len(output)
+        self._add_checkpoint()
+        return True
+
+    def _add_checkpoint(self):
+        raw_position = self._raw.tell() - len(self._pending)
+        if self._decompressor is None:
+            self.checkpoints.add(position=self._buffer_end, raw_position=raw_position, state=None)
+        elif hasattr(self._decompressor, "copy") and self.checkpoints.is_due(position=self._buffer_end):
+            self.checkpoints.add(position=self._buffer_end, raw_position=raw_position, state=self._decompressor.copy())
+
+    # Skip the data between the streams (xz stream padding, zstd skippable frames)
+    def _skip_padding(self, data: bytes):
+        while True:
+            if not data:
+                data = self._raw.read(RAW_CHUNK_SIZE)
+                if not data:
+                    return data
+            if self.compression == "xz":
+                data = data.lstrip(b"\0")
+                if data:
+                    return data
+            elif self.compression == "zstd" and len(data) >= 8:
+                magic, size = struct.unpack("<2I", data[:8])
+                if not ZSTD_SKIPPABLE_MAGIC[0] <= magic <= ZSTD_SKIPPABLE_MAGIC[1]:
+                    return data
+                if 8 + size > len(data):
+                    self._raw.seek(8 + size - len(data), os.SEEK_CUR)
+                data = data[8 + size :]
+            else:
+                return data
+
+    # The seek table of the zstd seekable format gives the checkpoint of every frame without decompression
+    def _read_zstd_seek_table(self):
+        raw_size = os.fstat(self._raw.fileno()).st_size
+        if raw_size < ZSTD_SEEKABLE_FOOTER_SIZE:
+            return
+        self._raw.seek(raw_size - ZSTD_SEEKABLE_FOOTER_SIZE)
+        n_frames, descriptor, magic = struct.unpack("<IBI", self._raw.read(ZSTD_SEEKABLE_FOOTER_SIZE))
+        if magic != ZSTD_SEEKABLE_MAGIC:
+            return
+        entry_size = 12 if descriptor & 0x80 else 8
+        table_size = n_frames * entry_size
+        self._raw.seek(raw_size - ZSTD_SEEKABLE_FOOTER_SIZE - table_size)
+        table = self._raw.read(table_size)
+        position = raw_position = 0
+        for idx in range(n_frames):
+            raw_size, size = struct.unpack_from("<2I", table, idx * entry_size)
+            position += size
+            raw_position += raw_size
+            self.checkpoints.add(position=position, raw_position=raw_position, state=None)
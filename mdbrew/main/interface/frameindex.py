@@ -0,0 +1,148 @@
+import os
+import hashlib
+import numpy as np
+
+
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".mdbrew.npz"
+HASH_SIZE = 4096
+
+
+def get_index_path(path: str, cache_dir: str = None):
+    path = os.path.abspath(path)
+    if cache_dir is None:
+        dirname, basename = os.path.split(path)
+        return os.path.join(dirname, f".{basename}{INDEX_SUFFIX}")
+    path_hash = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}.{path_hash}{INDEX_SUFFIX}")
+
+
+def _hash_bytes(path: str, start: int, size: int = HASH_SIZE):
+    with open(file=path, mode="rb") as file:
+        file.seek(max(start, 0))
+        return hashlib.sha1(file.read(size)).hexdigest()
+
+
+class FrameIndex:
+    """FrameIndex
+
+    Byte offset, atom number and box of each frame in the trajectory, saved
+    as the sidecar file so that the trajectory is scanned only once.
+
+    Parameters
+    ------------
+    end : int
+        Byte position just after the last scanned frame, the next scan starts here
+    steps : np.ndarray
+        MD step (or time) of each frame written in the trajectory, NaN if unknown
+    """
+
+    def __init__(self) -> None:
+        self.offsets = np.zeros(0, dtype=np.int64)
+        self.atom_nums = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 3), dtype=float)
+        self.steps = np.zeros(0, dtype=float)
+        self.column = []
+        self.end = 0
+        self.size = 0
+        self.mtime_ns = 0
+        self.head_hash = ""
+        self.tail_hash = ""
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def extend(self, offsets, atom_nums, boxes, end: int, steps=None):
+        boxes = [box[:3] if len(box) else [np.nan] * 3 for box in boxes]
+        steps = [None] * len(offsets) if steps is None else steps
+        steps = [np.nan if step is None else step for step in steps]
+        self.offsets = np.concatenate([self.offsets, np.array(offsets, dtype=np.int64)])
+        self.atom_nums = np.concatenate([self.atom_nums, np.array(atom_nums, dtype=np.int64)])
+        self.boxes = np.concatenate([self.boxes, np.array(boxes, dtype=float).reshape(-1, 3)])
+        self.steps = np.concatenate([self.steps, np.array(steps, dtype=float)])
+        self.end = end
+
+    def truncate(self, num: int):
+        """Keep the first `num` frames, the next scan starts at the offset of the frame `num`"""
+        if num >= len(self):
+            return
+        self.end = int(self.offsets[max(num, 0)])
+        self.offsets = self.offsets[:num]
+        self.atom_nums = self.atom_nums[:num]
+        self.boxes = self.boxes[:num]
+        self.steps = self.steps[:num]
+
+    def sign(self, path: str, is_compressed: bool = False):
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        # The offsets of the compressed file are not the positions in the file, so the whole file is signed
+        end = stat.st_size if is_compressed else self.end
+        self.head_hash = _hash_bytes(path=path, start=0, size=min(end, HASH_SIZE))
+        self.tail_hash = _hash_bytes(path=path, start=end - HASH_SIZE, size=min(end, HASH_SIZE))
+
+    def check(self, path: str, is_compressed: bool = False):
+        """Return 'fresh' if the file is unchanged, 'grown' if the frames are appended, else 'stale'"""
+        stat = os.stat(path)
+        if stat.st_size == self.size:
+            # The file of the same size is rewritten if the mtime is changed, the hashes do not see the middle of the file
+            status = "fresh" if stat.st_mtime_ns == self.mtime_ns else "stale"
+        elif not is_compressed and stat.st_size > self.size:
+            status = "grown"
+        else:
+            return "stale"
+        end = stat.st_size if is_compressed else self.end
+        if self.head_hash != _hash_bytes(path=path, start=0, size=min(end, HASH_SIZE)):
+            return "stale"
+        if self.tail_hash != _hash_bytes(path=path, start=end - HASH_SIZE, size=min(end, HASH_SIZE)):
+            return "stale"
+        return status
+
+    def save(self, index_path: str):
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(index_path), exist_ok=True)
+            with open(file=tmp_path, mode="wb") as file:
+                np.savez(
+                    file,
+                    version=INDEX_VERSION,
+                    offsets=self.offsets,
+                    atom_nums=self.atom_nums,
+                    boxes=self.boxes,
+                    steps=self.steps,
+                    column=np.array(self.column, dtype=str),
+                    end=self.end,
+                    size=self.size,
+                    mtime_ns=self.mtime_ns,
+                    head_hash=self.head_hash,
+                    tail_hash=self.tail_hash,
+                )
+            os.replace(tmp_path, index_path)
+        except OSError:
+            # The index is only a cache, read-only directory is not an error
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, index_path: str):
+        if not os.path.isfile(index_path):
+            return None
+        try:
+            with np.load(index_path, allow_pickle=False) as npz:
+                if int(npz["version"]) != INDEX_VERSION:
+                    return None
+                frame_index = cls()
+                frame_index.offsets = npz["offsets"]
+                frame_index.atom_nums = npz["atom_nums"]
+                frame_index.boxes = npz["boxes"]
+                frame_index.steps = npz["steps"]
+                frame_index.column = npz["column"].tolist()
+                frame_index.end = int(npz["end"])
+                frame_index.size = int(npz["size"])
+                frame_index.mtime_ns = int(npz["mtime_ns"])
+                frame_index.head_hash = str(npz["head_hash"])
+                frame_index.tail_hash = str(npz["tail_hash"])
+        except Exception:
+            # Broken or old index is rebuilt from the trajectory
+            return None
+        return frame_index
@@ -0,0 +1,157 @@
+import copy
+import itertools
+import numpy as np
+from typing import List
+from .opener import OpenerInterface
+
+
+class MultiOpener:
+    """MultiOpener
+
+    Openers of the trajectory segments (run.0001, run.0002, ...) presented as
+    one trajectory. The global frame is mapped to (segment, frame of segment)
+    and the segment moves with its own frame index, so the seek is O(1).
+
+    Parameters
+    ------------
+    openers : List[OpenerInterface]
+        Openers of the segments in the order of the simulation
+    drop_duplicates : bool
+        Drop the first frames of each segment whose step is not larger than
+        the last step of the previous segment (frames written again at restart)
+    """
+
+    def __init__(self, openers: List[OpenerInterface], drop_duplicates: bool = False) -> None:
+        assert len(openers), "There is no trajectory file"
+        self.openers = list(openers)
+        self.is_drop_duplicates = drop_duplicates
+        self.path = [opener.path for opener in self.openers]
+        self.segment = 0
+
+    @property
+    def opener(self) -> OpenerInterface:
+        return self.openers[self.segment]
+
+    @property
+    def fmt(self):
+        return self.opener.fmt
+
+    @property
+    def is_require_atomdict(self):
+        return self.opener.is_require_atomdict
+
+    @property
+    def atom_keyword(self):
+        return self.opener.atom_keyword
+
+    @property
+    def column(self):
+        return self.opener.column
+
+    @column.setter
+    def column(self, column):
+        self.opener.column = column
+
+    @property
+    def required_fields(self):
+        return self.opener.required_fields
+
+    @property
+    def box_size(self):
+        return self.opener.box_size
+
+    @box_size.setter
+    def box_size(self, box_size):
+        self.opener.box_size = box_size
+
+    @property
+    def data(self):
+        return self.opener.data
+
+    @property
+    def segment_starts(self):
+        """First frame of each segment which is not dropped"""
+        if not hasattr(self, "_segment_starts"):
+            self._make_segment_table()
+        return self._segment_starts
+
+    @property
+    def frame_starts(self):
+        """Global frame of the first frame of each segment, the last one is the number of frames"""
+        if not hasattr(self, "_frame_starts"):
+            self._make_segment_table()
+        return self._frame_starts
+
+    @property
+    def n_frames(self):
+        return int(self.frame_starts[-1])
+
+    @property
+    def frame(self):
+        return int(self.frame_starts[self.segment] + self.opener.frame - self.segment_starts[self.segment])
+
+    @property
+    def steps(self):
+        return np.concatenate([opener.frame_index.steps[start:] for opener, start in zip(self.openers, self.segment_starts)])
+
+    def clone(self):
+        """New opener of the same segments with its own position"""
+        self._make_segment_table()
+        multi_opener = copy.copy(self)
+        multi_opener.openers = [opener.clone() for opener in self.openers]
+        return multi_opener
+
+    def get_state(self):
+        return self.frame, self.opener.get_state()
+
+    def set_state(self, state):
+        frame, opener_state = state
+        self.segment = int(np.searchsorted(self.frame_starts, frame, side="right")) - 1
+        self.opener.set_state(opener_state)
+
+    def next_frame(self):
+        try:
+            self.opener.next_frame()
+        except StopIteration:
+            self._move_segment(segment=self.segment + 1)
+
+    def move_frame(self, num):
+        if num >= self.n_frames:
+            raise StopIteration
+        segment = int(np.searchsorted(self.frame_starts, num, side="right")) - 1
+        self._move_segment(segment=segment, num=num - self.frame_starts[segment])
+
+    def iter_frames(self, frames):
+        frames = np.array(list(itertools.takewhile(lambda frame: frame < self.n_frames, frames)), dtype=np.int64)
+        segments = np.searchsorted(self.frame_starts, frames, side="right") - 1
+        local_frames = self.segment_starts[segments] + frames - self.frame_starts[segments]
+        for segment, group in itertools.groupby(zip(segments, local_frames, frames), key=lambda item: item[0]):
+            _, local_group, global_group = zip(*group)
+            self.segment = int(segment)
+            for _, frame in zip(self.opener.iter_frames(frames=local_group), global_group):
+                yield int(frame)
+
+    def _move_segment(self, segment: int, num: int = 0):
+        # The segments whose frames are all dropped are skipped
+        while segment < len(self.openers) and self.segment_starts[segment] + num >= self.openers[segment].n_frames:
+            segment, num = segment + 1, 0
+        if segment >= len(self.openers):
+            raise StopIteration
+        self.segment = segment
+        self.opener.move_frame(num=int(self.segment_starts[segment] + num))
+
+    def _make_segment_table(self):
+        starts, counts = [], []
+        last_step = -np.inf
+        for opener in self.openers:
+            steps = opener.frame_index.steps
+            start = 0
+            if self.is_drop_duplicates:
+                is_duplicated = steps <= last_step
+                start = len(steps) if is_duplicated.all() else int(np.argmin(is_duplicated))
+            if start < len(steps) and not np.isnan(steps[-1]):
+                last_step = steps[-1]
+            starts.append(start)
+            counts.append(len(steps) - start)
+        self._segment_starts = np.array(starts, dtype=np.int64)
+        self._frame_starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
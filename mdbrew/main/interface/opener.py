@@ -1,5 +1,68 @@
+import os
+import copy
+import mmap
+import numpy as np
 from typing import Dict, Type
 from abc import abstractmethod, abstractproperty, ABCMeta
+from mdbrew.main.frame import Frame
+from .frameindex import FrameIndex, get_index_path
+from .compression import Checkpoints, CompressedFile, get_compression, open_file, CHECKPOINT_SIZE
+
+
+CHUNK_SIZE = 1 << 22
+
+
+def skip_binary_lines(file, num: int, chunk_size: int = CHUNK_SIZE):
+    """Move the binary file object just after the next `num` newlines, counting them in chunks"""
+    is_line_open = False
+    while num > 0:
+        start = file.tell()
+        chunk = file.read(chunk_size)
+        if not chunk:
+            # The last line of the file does not always end with the newline
+            if num == 1 and is_line_open:
+                return
+            raise EOFError("Unexpected end of file")
+        newline_idx = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n"))
+        if len(newline_idx) >= num:
+            file.seek(start + int(newline_idx[num - 1]) + 1)
+            return
+        num -= len(newline_idx)
+        is_line_open = chunk[-1:] != b"\n"
+
+
+def read_binary_lines(file, num: int, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """Read the next `num` lines of the binary file object as one block"""
+    chunks = []
+    while num > 0:
+        start = file.tell()
+        chunk = file.read(chunk_size)
+        if not chunk:
+            # The last line of the file does not always end with the newline
+            if num == 1 and chunks and chunks[-1][-1:] != b"\n":
+                break
+            raise EOFError("Unexpected end of file")
+        newline_idx = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n"))
+        if len(newline_idx) >= num:
+            end = int(newline_idx[num - 1]) + 1
+            chunks.append(chunk[:end])
+            file.seek(start + end)
+            break
+        num -= len(newline_idx)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def skip_binary_bytes(file, size: int):
+    """Move the binary file object forward by `size` bytes, raise EOFError if the file is shorter"""
+    target = file.tell() + size
+    if isinstance(getattr(file, "raw", None), CompressedFile):
+        # The seek of the compressed file stops at the end of file
+        is_eof = file.seek(target) < target
+    else:
+        is_eof = file.seek(target) > os.fstat(file.fileno()).st_size
+    if is_eof:
+        raise EOFError("Unexpected end of file")
 
 
 class OpenerInterface(metaclass=ABCMeta):
@@ -14,6 +77,12 @@ class OpenerInterface(metaclass=ABCMeta):
         self.column = []
         self.box_size = []
         self.atom_keyword = "atom"
+        self.cache_dir = kwrgs.get("cache_dir", os.environ.get("MDBREW_CACHE_DIR", None))
+        self.is_index_cached = kwrgs.get("index_cache", True)
+        self.is_static_topology = kwrgs.get("static_topology", True)
+        self.fields = kwrgs.get("fields", None)
+        self.compression = get_compression(path=path)
+        self.checkpoints = Checkpoints(checkpoint_size=kwrgs.get("checkpoint_size", CHECKPOINT_SIZE))
 
     def __init_subclass__(cls) -> None:
         name = cls.fmt.lower()
@@ -31,6 +100,30 @@ class OpenerInterface(metaclass=ABCMeta):
             self._data = next(self.database)
         return self._data
 
+    @property
+    def frame_index(self):
+        if not hasattr(self, "_frame_index"):
+            self._frame_index = self.load_frame_index()
+        return self._frame_index
+
+    @property
+    def frame_offsets(self):
+        return self.frame_index.offsets
+
+    @property
+    def n_frames(self):
+        return len(self.frame_offsets)
+
+    @property
+    def required_fields(self):
+        """Columns to be parsed, the atom keyword is always parsed for the information of atoms
+
+        The ids (id, idx) are parsed too, so the topology of the reordered frame is not reused
+        """
+        if self.fields is None:
+            return None
+        return [*self.fields, self.atom_keyword, *(col for col in ("id", "idx") if col in self.column)]
+
     @abstractproperty
     def fmt(self) -> str:
         pass
@@ -38,29 +131,147 @@ class OpenerInterface(metaclass=ABCMeta):
     def next_frame(self):
         self._data = next(self._database)
 
+    def clone(self):
+        """New opener of the same trajectory with its own position, the frame index and the checkpoints are shared"""
+        self._frame_index = self.frame_index
+        opener = copy.copy(self)
+        for attr in ("_database", "_data"):
+            opener.__dict__.pop(attr, None)
+        return opener
+
+    # The generator and the maps of the file are not pickled, the opener in the other process opens the file again
+    def __getstate__(self):
+        self._frame_index = self.frame_index
+        state = self.__dict__.copy()
+        for attr in ("_database", "_data"):
+            state.pop(attr, None)
+        for attr, value in self.__dict__.items():
+            if isinstance(value, (mmap.mmap, np.memmap)):
+                state.pop(attr)
+        return state
+
+    def get_state(self):
+        return self.frame, self.data, self.box_size, self.column
+
+    def set_state(self, state):
+        self.frame, self._data, self.box_size, self.column = state
+
     def move_frame(self, num):
-        total_skip_line = self.total_line_num * num
-        self.skip_head += total_skip_line
         self._database = self.generate_database(frame_num=num)
         self._data = next(self._database)
-        self.skip_head -= total_skip_line
 
     # Generation database
     def generate_database(self, frame_num: int = 0):
         self.frame = frame_num - 1
-        with open(file=self.path, mode=self.read_mode) as file:
-            self._skip_the_line(file=file)
+        with self.open_file(mode=self.read_mode) as file:
+            if frame_num:
+                if frame_num >= self.n_frames:
+                    return
+                file.seek(self.frame_offsets[frame_num])
+            else:
+                self._skip_the_line(file=file)
             while True:
                 try:
                     self.frame += 1
+                    # The frames after the indexed ones are not complete, the first frame is read without the scan
+                    if self.frame and self.frame >= self.n_frames:
+                        break
                     yield self._make_one_frame_data(file=file)
                 except:
                     break
 
+    # Parse only the given frames, the file is moved between them with the frame index
+    def iter_frames(self, frames):
+        with self.open_file(mode=self.read_mode) as file:
+            for frame in frames:
+                if frame >= self.n_frames:
+                    return
+                file.seek(self.frame_offsets[frame])
+                self.frame = frame
+                self._data = self._make_one_frame_data(file=file)
+                yield frame
+
+    # Load the sidecar index and scan only the part of the file which is not indexed yet
+    def load_frame_index(self):
+        index_path = get_index_path(path=self.path, cache_dir=self.cache_dir)
+        frame_index = FrameIndex.load(index_path=index_path) if self.is_index_cached else None
+        status = "stale" if frame_index is None else frame_index.check(path=self.path, is_compressed=self.compression is not None)
+        if status == "fresh":
+            return frame_index
+        if status == "stale":
+            frame_index = FrameIndex()
+        elif status == "grown":
+            # The last frame can be written only in part when it is indexed, so it is scanned again
+            frame_index.truncate(num=len(frame_index) - 1)
+        self.scan_frame_index(frame_index=frame_index)
+        frame_index.column = list(self.column) or frame_index.column
+        frame_index.sign(path=self.path, is_compressed=self.compression is not None)
+        if self.is_index_cached:
+            frame_index.save(index_path=index_path)
+        return frame_index
+
+    def scan_frame_index(self, frame_index: FrameIndex):
+        offsets, atom_nums, boxes, steps = [], [], [], []
+        with self.open_file(mode="rb") as file:
+            if frame_index.end:
+                file.seek(frame_index.end)
+            else:
+                self._skip_the_head_in_bytes(file=file)
+            end = file.tell()
+            while True:
+                offset = file.tell()
+                try:
+                    atom_num, box, step = self._scan_one_frame(file=file)
+                except Exception:
+                    break
+                end = file.tell()
+                offsets.append(offset)
+                atom_nums.append(atom_num)
+                boxes.append(box)
+                steps.append(step)
+            # The last frame without the newline at the end of file can be cut in the middle of the line
+            if offsets and not self._is_complete_last_frame(file=file, offset=offsets[-1], end=end):
+                end = offsets.pop()
+                del atom_nums[-1], boxes[-1], steps[-1]
+        frame_index.extend(offsets=offsets, atom_nums=atom_nums, boxes=boxes, end=end, steps=steps)
+
+    # The frame ending at the newline or before the other data is complete, the others are checked by parsing
+    # with the copy of the opener, so the box and the columns of this opener are not changed
+    def _is_complete_last_frame(self, file, offset: int, end: int):
+        file.seek(end - 1)
+        tail = file.read(2)
+        if len(tail) == 2 or tail == b"\n":
+            return True
+        with self.open_file(mode=self.read_mode) as frame_file:
+            frame_file.seek(offset)
+            try:
+                data = copy.copy(self)._make_one_frame_data(file=frame_file)
+                # The rows of the last atom cut in the middle are shorter than the others
+                assert isinstance(data, Frame) or np.asarray(data).ndim == 2
+            except Exception:
+                return False
+        return True
+
+    # The compressed file shares the checkpoints, so the seek does not restart from the beginning
+    def open_file(self, mode: str = None):
+        return open_file(path=self.path, mode=mode or self.read_mode, checkpoints=self.checkpoints)
+
     @abstractmethod
     def _make_one_frame_data(self, file):
         pass
 
+    @abstractmethod
+    def _scan_one_frame(self, file) -> tuple:
+        """Move the binary file to the next frame and return (atom number, box, step), step is None if unknown"""
+        pass
+
+    # Parse the lines of one frame, the string columns are reused if the topology is static
+    def _make_frame_from_text(self, block: bytes):
+        topology = getattr(self, "_topology", None) if self.is_static_topology else None
+        frame_data = Frame.from_text(block=block, columns=self.column, topology=topology, fields=self.required_fields)
+        self._topology = frame_data.topology
+        return frame_data
+
     def _skip_the_line(self, file):
         if self.read_mode == "r":
             [next(file) for _ in range(self.skip_head)]
@@ -69,5 +280,13 @@ class OpenerInterface(metaclass=ABCMeta):
         else:
             raise ValueError("plz input correct read mode")
 
+    def _skip_the_head_in_bytes(self, file):
+        if self.read_mode == "r":
+            skip_binary_lines(file=file, num=self.skip_head)
+        elif self.read_mode == "rb":
+            file.seek(self.skip_head)
+        else:
+            raise ValueError("plz input correct read mode")
+
 
 opener_programs: Dict[str, Type[OpenerInterface]] = {}
@@ -0,0 +1,77 @@
+import queue
+import threading
+
+
+_END = object()
+
+
+class _Error:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Prefetcher:
+    """Prefetcher
+
+    Run the iterator on the background thread and keep at most `depth` items
+    in the queue, so the reading and the parsing of the next frames overlap
+    with the calculation on the current frame.
+
+    Parameters
+    ------------
+    iterator : Iterator
+        Iterator which is consumed only by the background thread
+    depth : int
+        Maximum number of the items waiting in the queue
+    """
+
+    def __init__(self, iterator, depth: int) -> None:
+        assert depth > 0, "depth should be larger than 0"
+        self._iterator = iterator
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+
+    def __iter__(self):
+        self._thread.start()
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, _Error):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+        while self._thread.is_alive():
+            # Empty the queue so that the blocked thread can see the stop
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            self._thread.join(timeout=0.01)
+
+    def _produce(self):
+        try:
+            for item in self._iterator:
+                if not self._put(item):
+                    return
+            self._put(_END)
+        except BaseException as error:
+            self._put(_Error(error))
+        finally:
+            if hasattr(self._iterator, "close"):
+                self._iterator.close()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -0,0 +1,50 @@
+import re
+import numpy as np
+import pandas as pd
+from mdbrew.main.frame import Frame, to_native
+
+
+string_matcher = re.compile(r"\"[^\"]*\"|'[^']*'")
+name_matcher = re.compile(r"[A-Za-z_]\w*")
+
+
+class Selection:
+    """Selection
+
+    Compiled `what` (the expression of pandas.eval) of the atoms. If it uses
+    only the topology columns (atom, type, resid, ...), the indices are found
+    once and reused until the topology of the frame is changed. If it uses
+    the columns of each frame (z > 10), it is evaluated on these columns only.
+
+    Parameters
+    ------------
+    what : str
+        Expression of the atoms, Ex) "atom == 'O' and z > 10"
+    """
+
+    def __init__(self, what: str) -> None:
+        self.what = what
+        self.names = set(re.findall(name_matcher, re.sub(string_matcher, "", what)))
+        self._topology = None
+
+    def is_static(self, frame: Frame) -> bool:
+        return not self.names & set(frame.numeric_columns)
+
+    def get_index(self, frame: Frame) -> np.ndarray:
+        is_static = self.is_static(frame=frame)
+        if is_static and frame.topology is self._topology:
+            return self._index
+        index = np.flatnonzero(self._evaluate(frame=frame))
+        if is_static:
+            self._topology = frame.topology
+            self._index = index
+            self._sub_topology = {col: value[index] for col, value in frame.topology.items()}
+        return index
+
+    def take(self, frame: Frame) -> Frame:
+        index = self.get_index(frame=frame)
+        return frame.take(index, topology=self._sub_topology if self.is_static(frame=frame) else None)
+
+    def _evaluate(self, frame: Frame):
+        columns = {col: pd.Series(to_native(frame._get_column(col)), copy=False) for col in frame.columns if col in self.names}
+        return np.asarray(pd.eval(self.what, resolvers=[columns]), dtype=bool)
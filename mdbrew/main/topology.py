@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class Topology:
+    """Topology
+
+    Atoms of the trajectory as the integer codes of the kinds, it is built
+    once per atom list and shared by the frames with the same atoms.
+
+    Parameters
+    ------------
+    atoms : np.ndarray
+        (N,) names (or types) of the atoms
+
+    ## Coordinates sorted by the kinds
+    >>> topology = Topology(atoms=["O", "H", "H"])
+    >>> topology.kinds, topology.codes, topology.counts
+    (array(['H', 'O']), array([1, 0, 0]), array([2, 1]))
+    >>> coords[topology.order]
+    """
+
+    def __init__(self, atoms) -> None:
+        self.atoms = np.asarray(atoms, dtype=str)
+        self.kinds, self.codes, self.counts = np.unique(self.atoms, return_inverse=True, return_counts=True)
+        self.codes = self.codes.reshape(-1)
+        self.atom_num = len(self.atoms)
+        # Indices of the atoms sorted by the kinds, the order in each kind is kept
+        self.order = np.argsort(self.codes, kind="stable")
+        self.indices = dict(zip(self.kinds, np.split(self.order, np.cumsum(self.counts)[:-1])))
+
+    def __len__(self) -> int:
+        return self.atom_num
+
+    @property
+    def info(self):
+        return self.kinds, self.counts
+
+    def map_kinds(self, kind_dict: dict, key=str):
+        """Array of `kind_dict[key(kind)]` of each atom, the dictionary is looked up once per kind"""
+        return np.array([kind_dict[key(kind)] for kind in self.kinds])[self.codes]
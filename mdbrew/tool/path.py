@@ -1,7 +1,25 @@
 import os
+import re
+import glob
 
 
 def check_path(path, **kwrgs):
     path = os.path.join(os.getcwd(), path)
     assert os.path.isfile(path=path), f"Check your path || not {path}"
     return path
+
+
+def check_paths(paths, **kwrgs):
+    """Check the list of paths or the glob pattern, the paths of the glob are sorted in natural order (run.2 < run.10)"""
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(os.path.join(os.getcwd(), paths)), key=_natural_key)
+        assert len(paths), "Check your path || No file matches the pattern"
+    return [check_path(path=path, **kwrgs) for path in paths]
+
+
+def is_multi_path(path):
+    return not isinstance(path, str) or glob.has_magic(path)
+
+
+def _natural_key(path: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", path)]
@@ -1,2 +1,4 @@
 from ._periodic_kdtree import *
 from ._spacer import *
+from ._neighbor import *
+from ._pair import *
@@ -0,0 +1,229 @@
+import os
+import numpy as np
+
+__all__ = ["KERNEL_BACKEND"]
+
+
+# Numba is optional, the kernels of NumPy are used if it is not installed or MDBREW_KERNEL=numpy
+try:
+    if os.environ.get("MDBREW_KERNEL", "auto").lower() == "numpy":
+        raise ImportError
+    import numba
+except ImportError:
+    numba = None
+
+KERNEL_BACKEND = "numpy" if numba is None else "numba"
+
+
+def check_kernel(kernel: str = None):
+    """Kernel to be used, None is KERNEL_BACKEND"""
+    kernel = KERNEL_BACKEND if kernel is None else kernel
+    assert kernel in ("numpy", "numba"), "kernel should be 'numpy' or 'numba'"
+    assert kernel == "numpy" or numba is not None, "numba is required, plz install with 'pip install numba'"
+    return kernel
+
+
+# The operations are done in the same order as the NumPy kernels, so the results are identical
+if numba is not None:
+
+    @numba.njit(cache=True, inline="always")
+    def _min_image_distance(a, b, box):
+        total = 0.0
+        for k in range(3):
+            diff = abs(a[k] - b[k])
+            diff = min(diff, box[k] - diff)
+            total += diff * diff
+        return np.sqrt(total)
+
+    @numba.njit(cache=True, inline="always")
+    def _bin_distance(distance, edges, r_max, scale):
+        resolution = len(edges) - 1
+        if not (distance >= 0.0 and distance <= r_max):
+            return -1
+        idx = int(distance * scale)
+        if idx == resolution:
+            idx -= 1
+        if distance < edges[idx]:
+            idx -= 1
+        if idx != resolution - 1 and distance >= edges[idx + 1]:
+            idx += 1
+        return idx
+
+    @numba.njit(cache=True, parallel=True)
+    def _pair_histogram(a_position, b_position, box, edges, r_max, scale, is_same, n_block):
+        a_number, b_number = len(a_position), len(b_position)
+        # the rows are strided over the blocks to balance the triangle of i < j
+        hists = np.zeros((n_block, len(edges) - 1), dtype=np.int64)
+        for block in numba.prange(n_block):
+            for i in range(block, a_number, n_block):
+                for j in range(i + 1 if is_same else 0, b_number):
+                    idx = _bin_distance(_min_image_distance(a_position[i], b_position[j], box), edges, r_max, scale)
+                    if idx >= 0:
+                        hists[block, idx] += 1
+        return hists.sum(axis=0)
+
+    @numba.njit(cache=True, parallel=True)
+    def _neighbor_count(a_position, b_position, box, r_cut, is_same):
+        counts = np.zeros(len(a_position), dtype=np.int64)
+        for i in numba.prange(len(a_position)):
+            count = 0
+            for j in range(len(b_position)):
+                if is_same and i == j:
+                    continue
+                if _min_image_distance(a_position[i], b_position[j], box) <= r_cut:
+                    count += 1
+            counts[i] = count
+        return counts
+
+    @numba.njit(cache=True, parallel=True)
+    def _cos_between_vectors(v1, v2):
+        cos = np.empty(len(v1))
+        for i in numba.prange(len(v1)):
+            dot = v1[i, 0] * v2[i, 0] + v1[i, 1] * v2[i, 1] + v1[i, 2] * v2[i, 2]
+            norm_v1 = np.sqrt(v1[i, 0] * v1[i, 0] + v1[i, 1] * v1[i, 1] + v1[i, 2] * v1[i, 2])
+            norm_v2 = np.sqrt(v2[i, 0] * v2[i, 0] + v2[i, 1] * v2[i, 1] + v2[i, 2] * v2[i, 2])
+            cos[i] = dot / (norm_v1 * norm_v2)
+        return cos
+
+    @numba.njit(cache=True, inline="always")
+    def _receive_bits(data, pos, num_of_bits):
+        start, end = pos >> 3, (pos + num_of_bits + 7) >> 3
+        chunk = np.int64(0)
+        for idx in range(start, end):
+            chunk = (chunk << 8) | (np.int64(data[idx]) if idx < len(data) else 0)
+        return (chunk >> ((end << 3) - pos - num_of_bits)) & ((np.int64(1) << num_of_bits) - 1), pos + num_of_bits
+
+    @numba.njit(cache=True, inline="always")
+    def _receive_ints(data, pos, num_of_bits, sizes, nums, bytes_buffer):
+        # The bytes are sent from the lowest one, the number is divided by the sizes byte by byte (xdrfile.c)
+        bytes_buffer[:] = 0
+        num_of_bytes = 0
+        while num_of_bits > 8:
+            bytes_buffer[num_of_bytes], pos = _receive_bits(data, pos, 8)
+            num_of_bytes += 1
+            num_of_bits -= 8
+        if num_of_bits > 0:
+            bytes_buffer[num_of_bytes], pos = _receive_bits(data, pos, num_of_bits)
+            num_of_bytes += 1
+        for i in range(2, 0, -1):
+            number = np.int64(0)
+            for j in range(num_of_bytes - 1, -1, -1):
+                number = (number << 8) | bytes_buffer[j]
+                quotient = number // sizes[i]
+                bytes_buffer[j] = quotient
+                number -= quotient * sizes[i]
+            nums[i] = number
+        nums[0] = bytes_buffer[0] | (bytes_buffer[1] << 8) | (bytes_buffer[2] << 16) | (bytes_buffer[3] << 24)
+        return pos
+
+    @numba.njit(cache=True)
+    def _size_of_ints(sizes):
+        # Bits of the product of the sizes, the product is kept in the bytes since it can be larger than 64 bits
+        product = np.zeros(32, dtype=np.int64)
+        product[0] = 1
+        num_of_bytes = 1
+        for size in sizes:
+            carry = np.int64(0)
+            for idx in range(num_of_bytes):
+                carry += product[idx] * size
+                product[idx] = carry & 0xFF
+                carry >>= 8
+            while carry:
+                product[num_of_bytes] = carry & 0xFF
+                num_of_bytes += 1
+                carry >>= 8
+        num_of_bits, top = 0, product[num_of_bytes - 1]
+        while (np.int64(1) << num_of_bits) <= top:
+            num_of_bits += 1
+        return num_of_bits + (num_of_bytes - 1) * 8
+
+    @numba.njit(cache=True)
+    def _decompress_xtc(data, natoms, minint, maxint, smallidx, magicints, firstidx):
+        int_coords = np.zeros((natoms, 3), dtype=np.int64)
+        sizeint = maxint - minint + 1
+        bitsizeint = np.zeros(3, dtype=np.int64)
+        bitsize = 0
+        if (sizeint[0] | sizeint[1] | sizeint[2]) > 0xFFFFFF:
+            for k in range(3):
+                while (np.int64(1) << bitsizeint[k]) <= sizeint[k]:
+                    bitsizeint[k] += 1
+        else:
+            bitsize = _size_of_ints(sizeint)
+        smaller = magicints[max(firstidx, smallidx - 1)] // 2
+        smallnum = magicints[smallidx] // 2
+        sizesmall = np.full(3, magicints[smallidx], dtype=np.int64)
+        nums = np.zeros(3, dtype=np.int64)
+        bytes_buffer = np.zeros(32, dtype=np.int64)
+
+        pos, i, atom, run = 0, 0, 0, 0
+        while i < natoms:
+            if bitsize == 0:
+                for k in range(3):
+                    nums[k], pos = _receive_bits(data, pos, bitsizeint[k])
+            else:
+                pos = _receive_ints(data, pos, bitsize, sizeint, nums, bytes_buffer)
+            i += 1
+            px, py, pz = nums[0] + minint[0], nums[1] + minint[1], nums[2] + minint[2]
+
+            is_smaller = 0
+            flag, pos = _receive_bits(data, pos, 1)
+            if flag:
+                run, pos = _receive_bits(data, pos, 5)
+                is_smaller = run % 3
+                run -= is_smaller
+                is_smaller -= 1
+            if run > 0:
+                for k in range(0, run, 3):
+                    pos = _receive_ints(data, pos, smallidx, sizesmall, nums, bytes_buffer)
+                    i += 1
+                    x, y, z = nums[0] + px - smallnum, nums[1] + py - smallnum, nums[2] + pz - smallnum
+                    if k == 0:
+                        # The first and second atoms are interchanged for the better compression of water
+                        int_coords[atom, 0], int_coords[atom, 1], int_coords[atom, 2] = x, y, z
+                        int_coords[atom + 1, 0], int_coords[atom + 1, 1], int_coords[atom + 1, 2] = px, py, pz
+                        atom += 2
+                    else:
+                        int_coords[atom, 0], int_coords[atom, 1], int_coords[atom, 2] = x, y, z
+                        atom += 1
+                    px, py, pz = x, y, z
+            else:
+                int_coords[atom, 0], int_coords[atom, 1], int_coords[atom, 2] = px, py, pz
+                atom += 1
+
+            smallidx += is_smaller
+            if is_smaller < 0:
+                smallnum = smaller
+                smaller = magicints[smallidx - 1] // 2 if smallidx > firstidx else 0
+            elif is_smaller > 0:
+                smaller = smallnum
+                smallnum = magicints[smallidx] // 2
+            sizesmall[:] = magicints[smallidx]
+        return int_coords
+
+
+def pair_histogram(a_position, b_position, box, r_max: float, resolution: int, is_same: bool):
+    """Histogram of the pairs (i < j if is_same) by the compiled kernel"""
+    edges = np.linspace(0, r_max, resolution + 1)
+    n_block = max(1, min(len(a_position), 4 * numba.get_num_threads()))
+    return _pair_histogram(a_position, b_position, box, edges, float(r_max), resolution / r_max, is_same, n_block)
+
+
+def neighbor_count(a_position, b_position, box, r_cut: float, is_same: bool):
+    return _neighbor_count(a_position, b_position, box, float(r_cut), is_same)
+
+
+def cos_between_vectors(v1, v2):
+    return _cos_between_vectors(v1, v2)
+
+
+def decompress_xtc(data: bytes, natoms: int, minint, maxint, smallidx: int, magicints, firstidx: int):
+    """(natoms, 3) integer coordinates of the compressed xtc frame by the compiled kernel"""
+    return _decompress_xtc(
+        np.frombuffer(data, dtype=np.uint8),
+        natoms,
+        np.asarray(minint, dtype=np.int64),
+        np.asarray(maxint, dtype=np.int64),
+        smallidx,
+        np.asarray(magicints, dtype=np.int64),
+        firstidx,
+    )
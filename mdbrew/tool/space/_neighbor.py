@@ -0,0 +1,38 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+__all__ = ["wrap_in_box", "search_pair_distance"]
+
+
+# Move the positions into [0, box), the periodic tree requires it
+def wrap_in_box(position, box):
+    box = np.asarray(box, dtype=float)
+    position = np.mod(position, box)
+    return np.where(position >= box, position - box, position)
+
+
+def search_pair_distance(a_position, b_position, box, r_max: float):
+    """search_pair_distance
+
+    Pairs of a and b within `r_max` with the minimum image distance, the pairs
+    are found with the periodic KD-tree so the cost is O(N) for the fixed density
+
+    Parameters
+    ------------
+    a_position, b_position : np.ndarray
+        (N_a, 3) and (N_b, 3) positions, `b_position is a_position` builds one tree
+    box : np.ndarray
+        (3,) length of the orthorhombic box
+    r_max : float
+        Maximum distance of the pairs
+
+    Returns
+    ----------
+    (a_idx, b_idx, distance) of the pairs, the pair of the same atom has the distance 0
+    """
+    box = np.asarray(box, dtype=float)
+    assert box.shape == (3,), "The box should be (3,) orthorhombic box"
+    a_tree = cKDTree(wrap_in_box(a_position, box), boxsize=box)
+    b_tree = a_tree if b_position is a_position else cKDTree(wrap_in_box(b_position, box), boxsize=box)
+    pairs = a_tree.sparse_distance_matrix(b_tree, max_distance=r_max, output_type="ndarray")
+    return pairs["i"], pairs["j"], pairs["v"]
@@ -0,0 +1,162 @@
+import numpy as np
+from . import _kernel
+
+__all__ = ["iterate_pair_distance", "bin_distance", "calculate_distance_histogram", "calculate_pair_histogram", "count_neighbors"]
+
+
+PAIR_BLOCK_BYTES = 1 << 27
+# diff and buffer (3 + 3 float64), distance (float64) and bin index (intp) of one pair
+PAIR_BYTES = 8 * 8
+
+
+def _make_tile_size(a_number: int, b_number: int, max_bytes: int):
+    max_pairs = max(1, int(max_bytes) // PAIR_BYTES)
+    b_size = max(1, min(b_number, max_pairs))
+    a_size = max(1, min(a_number, max_pairs // b_size))
+    return a_size, b_size
+
+
+def iterate_pair_distance(a_position, b_position, box, *, max_bytes: int = PAIR_BLOCK_BYTES):
+    """iterate_pair_distance
+
+    Minimum image distances of A x B in the tiles, the memory of each tile is
+    bounded by `max_bytes` and the buffers are reused between the tiles.
+    If `b_position is a_position`, only the pairs i < j are given and the
+    distance of the other pairs in the tile is -1.
+
+    Parameters
+    ------------
+    a_position, b_position : np.ndarray
+        (N_a, 3) and (N_b, 3) positions
+    box : np.ndarray
+        (3,) length of the orthorhombic box
+    max_bytes : int, optional
+        default = 128 MiB, memory of the temporary arrays of one tile
+
+    Yields
+    ----------
+    (a_start, b_start, distance), distance is the (a_size, b_size) view of the buffer
+    """
+    is_same = b_position is a_position
+    a_position = np.asarray(a_position, dtype=float)
+    b_position = a_position if is_same else np.asarray(b_position, dtype=float)
+    box = np.asarray(box, dtype=float)
+    a_number, b_number = len(a_position), len(b_position)
+    a_size, b_size = _make_tile_size(a_number=a_number, b_number=b_number, max_bytes=max_bytes)
+    diff_buffer = np.empty((a_size, b_size, 3))
+    image_buffer = np.empty((a_size, b_size, 3))
+    distance_buffer = np.empty((a_size, b_size))
+    for a_start in range(0, a_number, a_size):
+        a_unit = a_position[a_start : a_start + a_size]
+        for b_start in range(a_start if is_same else 0, b_number, b_size):
+            b_unit = b_position[b_start : b_start + b_size]
+            shape = (len(a_unit), len(b_unit))
+            diff = diff_buffer[: shape[0], : shape[1]]
+            image = image_buffer[: shape[0], : shape[1]]
+            distance = distance_buffer[: shape[0], : shape[1]]
+            np.subtract(a_unit[:, None, :], b_unit[None, :, :], out=diff)
+            # minimum image in place, |d| -> min(|d|, box - |d|)
+            np.abs(diff, out=diff)
+            np.subtract(box, diff, out=image)
+            np.minimum(diff, image, out=diff)
+            np.square(diff, out=diff)
+            np.sum(diff, axis=-1, out=distance)
+            np.sqrt(distance, out=distance)
+            if is_same and b_start < a_start + shape[0]:
+                # pairs with j <= i in the tile on the diagonal
+                a_idx = np.arange(a_start, a_start + shape[0])[:, None]
+                b_idx = np.arange(b_start, b_start + shape[1])[None, :]
+                distance[b_idx <= a_idx] = -1.0
+            yield a_start, b_start, distance
+
+
+def bin_distance(distance, r_max: float, resolution: int):
+    """Bin index of the distances, the same bins as np.histogram(distance, bins=resolution, range=(0, r_max))
+
+    The distances out of [0, r_max] get the index -1
+    """
+    distance = np.asarray(distance, dtype=float).ravel()
+    edges = np.linspace(0, r_max, resolution + 1)
+    index = np.full(distance.shape, -1, dtype=np.intp)
+    is_in = (distance >= 0) & (distance <= r_max)
+    value = distance[is_in]
+    in_index = (value * (resolution / r_max)).astype(np.intp)
+    in_index[in_index == resolution] -= 1
+    # correct the rounding error at the edges as np.histogram does
+    in_index[value < edges[in_index]] -= 1
+    in_index[(value >= edges[in_index + 1]) & (in_index != resolution - 1)] += 1
+    index[is_in] = in_index
+    return index
+
+
+def calculate_distance_histogram(distance, r_max: float, resolution: int, weights=None):
+    """Histogram of the distances with np.bincount, same as np.histogram(distance, bins=resolution, range=(0, r_max))[0]"""
+    index = bin_distance(distance=distance, r_max=r_max, resolution=resolution)
+    is_in = index >= 0
+    if weights is not None:
+        weights = np.asarray(weights).ravel()[is_in]
+    return np.bincount(index[is_in], weights=weights, minlength=resolution)
+
+
+# Contiguous float arrays for the compiled kernels
+def _make_kernel_args(a_position, b_position, box):
+    a_array = np.ascontiguousarray(a_position, dtype=float)
+    b_array = a_array if b_position is a_position else np.ascontiguousarray(b_position, dtype=float)
+    box = np.ascontiguousarray(np.broadcast_to(np.asarray(box, dtype=float), (3,)))
+    return a_array, b_array, box
+
+
+def calculate_pair_histogram(
+    a_position,
+    b_position,
+    box,
+    r_max: float,
+    resolution: int,
+    *,
+    max_bytes: int = PAIR_BLOCK_BYTES,
+    kernel: str = None,
+):
+    """calculate_pair_histogram
+
+    Histogram of the minimum image distances of every pair (a, b), computed
+    tile by tile so the memory is bounded by `max_bytes`. It is the same as the
+    histogram of the full (N_a, N_b) distance matrix; if `b_position is a_position`,
+    only i < j is computed and the counts are doubled with the N pairs of the same atom.
+    If numba is installed, the distance and the bin are fused in the compiled kernel
+    on the threads (`kernel` = None is KERNEL_BACKEND, "numpy" or "numba").
+
+    ## Histogram of O-O pairs
+    >>> hist = calculate_pair_histogram(O, O, box, r_max=6.0, resolution=600)
+    """
+    is_same = b_position is a_position
+    if _kernel.check_kernel(kernel=kernel) == "numba":
+        hist = _kernel.pair_histogram(*_make_kernel_args(a_position, b_position, box), r_max, resolution, is_same)
+    else:
+        hist = np.zeros(resolution, dtype=np.int64)
+        for *_, distance in iterate_pair_distance(a_position, b_position, box, max_bytes=max_bytes):
+            hist += calculate_distance_histogram(distance=distance, r_max=r_max, resolution=resolution)
+    if is_same:
+        hist *= 2
+        hist[0] += len(a_position)
+    return hist
+
+
+def count_neighbors(a_position, b_position, box, r_cut: float, *, max_bytes: int = PAIR_BLOCK_BYTES, kernel: str = None):
+    """count_neighbors
+
+    Number of b within `r_cut` (minimum image) of each a, the atom itself is
+    not counted if `b_position is a_position`
+
+    ## Coordination number of O-O
+    >>> count = count_neighbors(O, O, box, r_cut=3.5)
+    """
+    is_same = b_position is a_position
+    if _kernel.check_kernel(kernel=kernel) == "numba":
+        return _kernel.neighbor_count(*_make_kernel_args(a_position, b_position, box), r_cut, is_same)
+    count = np.zeros(len(a_position), dtype=np.int64)
+    for a_start, b_start, distance in iterate_pair_distance(a_position, b_position, box, max_bytes=max_bytes):
+        is_near = (distance >= 0) & (distance <= r_cut)
+        count[a_start : a_start + distance.shape[0]] += is_near.sum(axis=1)
+        if is_same:
+            count[b_start : b_start + distance.shape[1]] += is_near.sum(axis=0)
+    return count
@@ -1,4 +1,5 @@
 import numpy as np
+from . import _kernel
 
 __all__ = [
     "check_dimension",
@@ -28,8 +29,16 @@ def calculate_distance(diff_position, axis: int = -1, dtype: str = float):
     return np.sqrt(np.sum(np.square(diff_position), axis=axis)).astype(dtype)
 
 
-# calculate the angle between vectors
-def calculate_angle_between_vectors(v1, v2):
+# calculate the angle between vectors, kernel = None is KERNEL_BACKEND, "numpy" or "numba"
+def calculate_angle_between_vectors(v1, v2, *, kernel: str = None):
+    v1, v2 = np.asarray(v1), np.asarray(v2)
+    is_kernel_input = v1.dtype == v2.dtype == float and v1.shape[-1:] == v2.shape[-1:] == (3,)
+    if _kernel.check_kernel(kernel=kernel) == "numba" and is_kernel_input:
+        # dot and norms are fused in the compiled kernel
+        v1, v2 = np.broadcast_arrays(v1, v2)
+        shape = v1.shape[:-1]
+        cos = _kernel.cos_between_vectors(np.ascontiguousarray(v1).reshape(-1, 3), np.ascontiguousarray(v2).reshape(-1, 3))
+        return np.arccos(cos.reshape(shape)) * 180.0 / np.pi
     dot_product = np.sum(v1 * v2, axis=-1)
     norm_v1 = np.linalg.norm(v1, axis=-1)
     norm_v2 = np.linalg.norm(v2, axis=-1)
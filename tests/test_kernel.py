@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from mdbrew.tool.space import _kernel, calculate_pair_histogram, count_neighbors, calculate_angle_between_vectors
+
+
+@pytest.fixture
+def positions():
+    pytest.importorskip("numba")
+    if _kernel.numba is None:
+        pytest.skip("the compiled kernels are turned off by MDBREW_KERNEL=numpy")
+    rng = np.random.default_rng(0)
+    box = np.array([12.0, 13.0, 14.0])
+    return rng.random((500, 3)) * box, rng.random((300, 3)) * box, box
+
+
+def test_pair_histogram_kernels(positions):
+    a_position, b_position, box = positions
+    for b in (a_position, b_position):
+        hists = [calculate_pair_histogram(a_position, b, box, r_max=6.0, resolution=200, kernel=kernel) for kernel in ("numpy", "numba")]
+        assert np.array_equal(*hists)
+
+
+def test_count_neighbors_kernels(positions):
+    a_position, b_position, box = positions
+    for b in (a_position, b_position):
+        counts = [count_neighbors(a_position, b, box, r_cut=3.5, kernel=kernel) for kernel in ("numpy", "numba")]
+        assert np.array_equal(*counts)
+
+
+def test_angle_kernels(positions):
+    a_position, b_position, _ = positions
+    angles = [calculate_angle_between_vectors(a_position[:300] - 6.0, b_position - 6.0, kernel=kernel) for kernel in ("numpy", "numba")]
+    assert np.array_equal(*angles)
@@ -0,0 +1,29 @@
+import numpy as np
+from mdbrew.main.brewery import Brewery
+
+
+def write_lammpstrj(path, frames):
+    lines = []
+    for step, (ids, types, coords) in enumerate(frames):
+        lines += ["ITEM: TIMESTEP", str(step), "ITEM: NUMBER OF ATOMS", str(len(ids)), "ITEM: BOX BOUNDS pp pp pp"]
+        lines += ["0 10", "0 10", "0 10", "ITEM: ATOMS id type x y z"]
+        lines += [f"{i} {t} {x:.6f} {y:.6f} {z:.6f}" for i, t, (x, y, z) in zip(ids, types, coords)]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_fields_with_reordered_dump(tmp_path):
+    rng = np.random.default_rng(0)
+    ids = np.arange(1, 21)
+    types = np.where(ids % 3 == 0, 2, 1)
+    frames = []
+    for _ in range(5):
+        order = rng.permutation(len(ids))
+        frames.append((ids[order], types[order], rng.random((len(ids), 3)) * 10))
+    path = tmp_path / "unsorted.lammpstrj"
+    write_lammpstrj(path, frames)
+
+    brewery = Brewery(trj_file=str(path), fields=["x", "y", "z"], index_cache=False)
+    for frame, (_, frame_types, coords) in zip(brewery.frange(), frames):
+        assert np.array_equal(brewery.atoms, frame_types.astype(str))
+        assert np.allclose(brewery.brew(cols=["x", "y", "z"], what="type == '2'"), coords[frame_types == 2])
+    assert frame == len(frames) - 1
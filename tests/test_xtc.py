@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from mdbrew.main.brewery import Brewery
+from mdbrew.tool.space import _kernel
+
+
+def write_gro(path, natoms):
+    lines = ["water", str(natoms)]
+    lines += [f"{i // 3 + 1:5d}{'SOL':<5s}{('OW', 'HW1', 'HW2')[i % 3]:>5s}{i + 1:5d}{0:8.3f}{0:8.3f}{0:8.3f}" for i in range(natoms)]
+    lines.append(f"{5:10.5f}{5:10.5f}{5:10.5f}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_xtc_kernels(tmp_path, monkeypatch):
+    pytest.importorskip("numba")
+    if _kernel.numba is None:
+        pytest.skip("the compiled kernels are turned off by MDBREW_KERNEL=numpy")
+    xtc = pytest.importorskip("mdtraj.formats")
+    rng = np.random.default_rng(0)
+    oxygens = rng.random((300, 3)) * 5
+    # The hydrogens near the oxygen are written in the runs of the small integers
+    waters = np.stack([oxygens, oxygens + rng.normal(0, 0.01, oxygens.shape), oxygens + rng.normal(0, 0.01, oxygens.shape)], axis=1)
+    coords = np.stack([waters.reshape(-1, 3), waters.reshape(-1, 3) + 0.1]).astype(np.float32)
+    write_gro(tmp_path / "water.gro", natoms=coords.shape[1])
+    with xtc.XTCTrajectoryFile(str(tmp_path / "water.xtc"), "w") as file:
+        file.write(coords, box=np.tile(np.eye(3, dtype=np.float32) * 5, (len(coords), 1, 1)))
+    with xtc.XTCTrajectoryFile(str(tmp_path / "water.xtc")) as file:
+        reference = file.read()[0]
+
+    results = {}
+    for kernel in ("numpy", "numba"):
+        monkeypatch.setattr(_kernel, "KERNEL_BACKEND", kernel)
+        brewery = Brewery(trj_file=str(tmp_path / "water.xtc"), gro=str(tmp_path / "water.gro"), index_cache=False)
+        results[kernel] = np.stack([brewery.coords for _ in brewery.frange()])
+    assert np.array_equal(results["numpy"], results["numba"])
+    assert np.array_equal(results["numba"], reference)